@@ -24,11 +24,186 @@ BASE_DOWNLOAD_PATH = os.getenv('BASE_DOWNLOAD_PATH',
 # yt-dlp 다운로드 형식 (사용자 요청사항 그대로)
 YT_DLP_FORMAT = "bestvideo*[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/bestvideo*+bestaudio/best"
 
+# 검색 결과 페이지가 도착하는 대로 다운로드 시작 (채널 전체 검색을 기다리지 않음)
+# 그때까지 도착한 결과 안에서만 우선순위를 적용하므로 DOWNLOAD_PRIORITY 순서가 전체 목록 기준이 아니게 됨
+DISCOVERY_STREAMING = os.getenv('DISCOVERY_STREAMING', 'False').lower() == 'true'
+
+# 동시 다운로드 수
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '1'))
+
+# 다운로드 우선순위 (views: 조회수 순 / recent: 최신 업로드 순 / engagement: 참여율 순 / none: 검색 순서)
+DOWNLOAD_PRIORITY = os.getenv('DOWNLOAD_PRIORITY', 'views')
+
+# 전체 다운로드가 함께 사용하는 대역폭 상한 (MB/s, 0이면 제한 없음)
+DOWNLOAD_BANDWIDTH_LIMIT_MB = float(os.getenv('DOWNLOAD_BANDWIDTH_LIMIT_MB', '0'))
+
+# 실행 중 대역폭 상한을 바꿀 때 사용하는 파일 (MB/s 숫자 한 줄, 비어 있으면 미사용)
+DOWNLOAD_BANDWIDTH_CONTROL_FILE = os.getenv('DOWNLOAD_BANDWIDTH_CONTROL_FILE', '')
+
 # ==================== VideoSubFinder 설정 ====================
 # VideoSubFinder 명령어 옵션
 VIDEOSUBFINDER_OPTIONS = ["-c", "-r", "-ccti"]
 VIDEOSUBFINDER_THRESHOLD = "0.41"  # -te 옵션 값
 
+# 자막 추출 후 TXTImages 이미지들을 팩 파일 하나(+인덱스)로 묶어 작은 파일 수를 줄임
+PACK_TXT_IMAGES = os.getenv('PACK_TXT_IMAGES', 'False').lower() == 'true'
+
+# ==================== 자막 추출 프록시 설정 ====================
+# VideoSubFinder 실행 전 ffmpeg로 자막 영역만 잘라낸 저해상도 흑백 프록시 영상을 만들어 분석
+SUBTITLE_PROXY_ENABLED = os.getenv('SUBTITLE_PROXY_ENABLED', 'False').lower() == 'true'
+
+# ffmpeg / ffprobe 실행 파일 경로 (PATH에 있으면 이름만 지정)
+FFMPEG_PATH = os.getenv('FFMPEG_PATH', 'ffmpeg')
+FFPROBE_PATH = os.getenv('FFPROBE_PATH', 'ffprobe')
+
+# 자막 영역 (원본 프레임 대비 비율, 0.0 ~ 1.0)
+SUBTITLE_PROXY_CROP_LEFT = float(os.getenv('SUBTITLE_PROXY_CROP_LEFT', '0.0'))
+SUBTITLE_PROXY_CROP_TOP = float(os.getenv('SUBTITLE_PROXY_CROP_TOP', '0.0'))
+SUBTITLE_PROXY_CROP_WIDTH = float(os.getenv('SUBTITLE_PROXY_CROP_WIDTH', '1.0'))
+SUBTITLE_PROXY_CROP_HEIGHT = float(os.getenv('SUBTITLE_PROXY_CROP_HEIGHT', '1.0'))
+
+# 프록시 영상 가로 해상도 (픽셀, 자막 영역보다 크면 원본 크기 유지)
+SUBTITLE_PROXY_WIDTH = int(os.getenv('SUBTITLE_PROXY_WIDTH', '540'))
+
+# 프록시 영상 프레임레이트 (0이면 원본 유지)
+SUBTITLE_PROXY_FPS = float(os.getenv('SUBTITLE_PROXY_FPS', '0'))
+
+# 추출 후 프록시 영상 보관 여부
+SUBTITLE_PROXY_KEEP = os.getenv('SUBTITLE_PROXY_KEEP', 'False').lower() == 'true'
+
+# 프록시로 찾은 TXTImages를 원본 영상의 같은 시각 프레임(컬러, 원본 해상도)에서 잘라낸 자막 영역으로 교체
+# (False면 프록시 해상도의 흑백 이미지 그대로 합성)
+SUBTITLE_PROXY_RESTORE_ORIGINAL = os.getenv('SUBTITLE_PROXY_RESTORE_ORIGINAL', 'True').lower() == 'true'
+
+# ==================== 다운로드 전 필터 설정 ====================
+# 메타데이터 기준으로 다운로드할 영상만 골라냄 (0 또는 빈 값이면 해당 규칙 미적용)
+FILTER_MIN_VIEWS = int(os.getenv('FILTER_MIN_VIEWS', '0'))
+FILTER_MIN_LIKES = int(os.getenv('FILTER_MIN_LIKES', '0'))
+FILTER_MIN_COMMENTS = int(os.getenv('FILTER_MIN_COMMENTS', '0'))
+
+# 참여율 = (좋아요 + 댓글) / 조회수
+FILTER_MIN_ENGAGEMENT = float(os.getenv('FILTER_MIN_ENGAGEMENT', '0'))
+
+# 영상 길이 범위 (초)
+FILTER_MIN_DURATION = int(os.getenv('FILTER_MIN_DURATION', '0'))
+FILTER_MAX_DURATION = int(os.getenv('FILTER_MAX_DURATION', '0'))
+
+# 제목/설명/태그 키워드 (쉼표로 구분, 대소문자 무시)
+FILTER_INCLUDE_KEYWORDS = [k.strip() for k in os.getenv('FILTER_INCLUDE_KEYWORDS', '').split(',') if k.strip()]
+FILTER_EXCLUDE_KEYWORDS = [k.strip() for k in os.getenv('FILTER_EXCLUDE_KEYWORDS', '').split(',') if k.strip()]
+
+# 채널별 조회수 상위 N개만 다운로드
+FILTER_TOP_N_PER_CHANNEL = int(os.getenv('FILTER_TOP_N_PER_CHANNEL', '0'))
+
+# 엄격한 쇼츠 판별 (#shorts 태그가 있는 영상만 쇼츠로 인정)
+FILTER_STRICT_SHORTS = os.getenv('FILTER_STRICT_SHORTS', 'False').lower() == 'true'
+
+# ==================== 작업 공간(디스크) 설정 ====================
+# 디스크 예산 관리 및 중간 산출물 자동 정리 사용 여부
+WORKSPACE_ENABLED = os.getenv('WORKSPACE_ENABLED', 'False').lower() == 'true'
+
+# 다운로드 임시 경로 (비어 있으면 채널 폴더에 바로 다운로드)
+WORKSPACE_SCRATCH_PATH = os.getenv('WORKSPACE_SCRATCH_PATH', '')
+
+# 합성 전 중간 산출물(다운로드 영상, 추출 이미지)이 동시에 차지할 수 있는 디스크 예산 (GB, 0이면 제한 없음)
+# 정리 후 보존 정책에 따라 남는 결과물은 포함하지 않으며, 예산을 넘으면 기다리지 않고 다운로드를 중단
+WORKSPACE_DISK_BUDGET_GB = float(os.getenv('WORKSPACE_DISK_BUDGET_GB', '0'))
+
+# 남은 디스크 용량이 이 값(GB) 아래로 떨어지면 다운로드 일시 중지
+WORKSPACE_MIN_FREE_GB = float(os.getenv('WORKSPACE_MIN_FREE_GB', '5'))
+
+# 한 번에 다운로드→추출→합성→정리까지 처리할 영상 수 (최소 1)
+WORKSPACE_BATCH_SIZE = max(1, int(os.getenv('WORKSPACE_BATCH_SIZE', '20')))
+
+# 공간 부족 시 재확인 간격 / 최대 대기 시간 (초)
+WORKSPACE_PAUSE_INTERVAL = 30
+WORKSPACE_PAUSE_TIMEOUT = 1800
+
+# 이미지 합성 성공 후 산출물별 보존 정책 (keep / delete / compress)
+WORKSPACE_RETENTION = {
+    'video': os.getenv('WORKSPACE_RETAIN_VIDEO', 'keep'),
+    'rgb_images': os.getenv('WORKSPACE_RETAIN_RGB_IMAGES', 'delete'),
+    'txt_images': os.getenv('WORKSPACE_RETAIN_TXT_IMAGES', 'compress'),
+    'combined': os.getenv('WORKSPACE_RETAIN_COMBINED', 'keep'),
+}
+
+# ==================== 감시(데몬) 모드 설정 ====================
+# 감시할 채널 목록 파일 (JSON) / 채널별 상태 저장 파일
+WATCHLIST_FILE = os.getenv('WATCHLIST_FILE', 'watchlist.json')
+WATCH_STATE_FILE = os.getenv('WATCH_STATE_FILE', 'watch_state.json')
+
+# 채널 확인 간격 (초): 기본값 / 업로드 빈도에 따라 조정되는 범위
+# (확인 1회는 업로드 재생목록 조회로 보통 2 units, 최소 간격 300초면 채널당 하루 최대 약 600 units)
+WATCH_DEFAULT_INTERVAL = int(os.getenv('WATCH_DEFAULT_INTERVAL', '1800'))
+WATCH_MIN_INTERVAL = int(os.getenv('WATCH_MIN_INTERVAL', '300'))
+WATCH_MAX_INTERVAL = int(os.getenv('WATCH_MAX_INTERVAL', '21600'))
+
+# 확인 간격에 더하는 무작위 편차 비율 (할당량 사용 분산)
+WATCH_JITTER = float(os.getenv('WATCH_JITTER', '0.2'))
+
+# 평균 업로드 간격 동안 채널을 확인할 횟수
+WATCH_POLLS_PER_UPLOAD = 4
+
+# 처리에 실패한 영상을 다음 확인 때 다시 시도하는 최대 횟수 (넘으면 건너뜀)
+WATCH_MAX_VIDEO_ATTEMPTS = int(os.getenv('WATCH_MAX_VIDEO_ATTEMPTS', '3'))
+
+# ==================== 분산 작업 큐 설정 ====================
+# 코디네이터/워커가 공유하는 SQLite 작업 큐 파일 (여러 장비에서 접근 가능한 공유 경로)
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH') or os.path.join(BASE_DOWNLOAD_PATH, 'jobs.sqlite3')
+
+# 작업 임대 시간 (초) - 이 시간 안에 하트비트가 없으면 다른 워커가 다시 가져감
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+
+# 작업당 최대 시도 횟수 (워커 비정상 종료 포함)
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+# 대기 중인 작업이 없을 때 다시 확인하는 간격 (초)
+JOB_POLL_INTERVAL = 10
+
+# ==================== 썸네일 설정 ====================
+# 각 영상 폴더에 썸네일 저장 여부
+THUMBNAIL_ENABLED = os.getenv('THUMBNAIL_ENABLED', 'True').lower() == 'true'
+
+# 썸네일 동시 다운로드 수 (연결 풀 크기)
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', '16'))
+
+# 썸네일 요청 타임아웃 (초)
+THUMBNAIL_TIMEOUT = 10
+
+# 썸네일 파일명 / 재실행 시 조건부 요청에 쓰는 캐시 정보 파일명
+THUMBNAIL_FILENAME = 'thumbnail.jpg'
+THUMBNAIL_META_FILENAME = 'thumbnail.json'
+
+# ==================== 통계 갱신 설정 ====================
+# 이미 처리한 영상의 조회수/좋아요/댓글 수를 다시 가져올 때 동시 요청 수
+STATS_REFRESH_WORKERS = int(os.getenv('STATS_REFRESH_WORKERS', '8'))
+
+# 통계 갱신 API 호출 속도 제한 (초당 호출 수)
+STATS_REFRESH_RATE = float(os.getenv('STATS_REFRESH_RATE', '20'))
+
+# 통계 시계열 저장 파일
+STATS_HISTORY_FILE = os.getenv('STATS_HISTORY_FILE') or os.path.join(BASE_DOWNLOAD_PATH, 'stats_history.csv')
+
+# 각 영상 폴더에 저장하는 메타데이터 파일명
+VIDEO_INFO_FILENAME = 'video_info.json'
+
+# ==================== 할당량/비용 예산 설정 ====================
+# 하루(태평양 시간 기준)에 이 프로그램이 사용할 YouTube API 할당량 (units, 0이면 제한 없음)
+QUOTA_BUDGET_UNITS = int(os.getenv('QUOTA_BUDGET_UNITS', '0'))
+
+# 실행 한 번에 다운로드할 최대 용량 (MB, 0이면 제한 없음, 감시 모드에서는 하루 단위)
+BANDWIDTH_BUDGET_MB = float(os.getenv('BANDWIDTH_BUDGET_MB', '0'))
+
+# 일별 할당량 사용량, 채널 통계 캐시, 처리량 기록 파일 (--dry-run 추정에 사용)
+PLANNER_STATE_FILE = os.getenv('PLANNER_STATE_FILE') or os.path.join(BASE_DOWNLOAD_PATH, 'planner_state.json')
+
+# 예산 소진으로 중단했을 때 남은 작업을 저장하는 파일 (--resume)
+RUN_STATE_FILE = os.getenv('RUN_STATE_FILE') or os.path.join(BASE_DOWNLOAD_PATH, 'run_state.json')
+
+# 처리 기록이 없을 때 사용하는 추정 기본값 (영상당 용량 MB / 자막 추출 시간 초)
+PLAN_DEFAULT_VIDEO_MB = float(os.getenv('PLAN_DEFAULT_VIDEO_MB', '10'))
+PLAN_DEFAULT_EXTRACT_SECONDS = float(os.getenv('PLAN_DEFAULT_EXTRACT_SECONDS', '30'))
+
 # ==================== 기타 설정 ====================
 # 디버그 모드
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
@@ -40,7 +215,17 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 API_REQUEST_DELAY = 0.1
 
 # 최대 재시도 횟수
-MAX_RETRY_ATTEMPTS = 3
+MAX_RETRY_ATTEMPTS = int(os.getenv('MAX_RETRY_ATTEMPTS', '3'))
+
+# 재시도 대기 시간 (지수 백오프 기본값 / 최대값, 초)
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1.0'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '60'))
+
+# 연속 실패가 이 횟수에 도달하면 해당 단계를 잠시 멈춤 (서킷 브레이커)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+
+# 서킷이 열린 뒤 다시 시도하기까지 대기 시간 (초)
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '60'))
 
 # 파일명에서 제거할 특수문자 (Windows 금지 문자 + 추가 문제 문자)
 INVALID_FILENAME_CHARS = ['<', '>', ':', '"', '/', '\\', '|', '?', '*']
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+우선순위에 따라 영상 다운로드를 배분하고 전체 대역폭을 제한하는 스케줄러 모듈
+"""
+
+import os
+import heapq
+import logging
+import itertools
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+from rate_limiter import TokenBucket
+from video_filter import VideoFilter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+
+def _upload_timestamp(video: Dict) -> float:
+    try:
+        return datetime.fromisoformat(video['upload_date'].replace('Z', '+00:00')).timestamp()
+    except (KeyError, ValueError):
+        return 0.0
+
+
+# 값이 작을수록 먼저 다운로드
+PRIORITY_KEYS = {
+    'views': lambda video: -video.get('view_count', 0),
+    'recent': lambda video: -_upload_timestamp(video),
+    'engagement': lambda video: -VideoFilter.engagement_ratio(video),
+    'none': lambda video: 0,
+}
+
+
+class DownloadScheduler:
+    def __init__(self,
+                 downloader,
+                 max_workers: int = config.DOWNLOAD_WORKERS,
+                 priority: str = config.DOWNLOAD_PRIORITY,
+                 bandwidth_limit_mb: float = config.DOWNLOAD_BANDWIDTH_LIMIT_MB,
+                 control_file: str = config.DOWNLOAD_BANDWIDTH_CONTROL_FILE):
+        """다운로드 스케줄러 초기화
+
+        downloader의 rate_limiter를 공유 대역폭 제한으로 사용한다 (없으면 새로 만들어 연결).
+        """
+        if priority not in PRIORITY_KEYS:
+            raise ValueError(f"❌ 알 수 없는 다운로드 우선순위: {priority} ({'/'.join(PRIORITY_KEYS)} 중 선택)")
+
+        self.downloader = downloader
+        self.max_workers = max(1, max_workers)
+        self.priority_key = PRIORITY_KEYS[priority]
+        self.control_file = control_file or None
+        self._control_mtime = None
+
+        if downloader.rate_limiter is None:
+            downloader.rate_limiter = TokenBucket(0)
+        self.rate_limiter = downloader.rate_limiter
+        self.set_bandwidth_limit(bandwidth_limit_mb)
+
+        self._heap: List[Tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    # ----------------- 대역폭 -----------------
+    def set_bandwidth_limit(self, limit_mb: float):
+        """실행 중에 전체 대역폭 상한 변경 (MB/s, 0이면 제한 없음)"""
+        self.rate_limiter.set_rate(limit_mb * MB)
+        if limit_mb > 0:
+            logger.info(f"다운로드 대역폭 상한: {limit_mb:g}MB/s")
+        else:
+            logger.info("다운로드 대역폭 제한 없음")
+
+    def _check_control_file(self):
+        """제어 파일이 바뀌었으면 대역폭 상한 다시 읽기"""
+        if not self.control_file or not os.path.exists(self.control_file):
+            return
+        try:
+            mtime = os.path.getmtime(self.control_file)
+            if mtime == self._control_mtime:
+                return
+            self._control_mtime = mtime
+            with open(self.control_file, 'r', encoding='utf-8') as f:
+                limit_mb = float(f.read().strip() or 0)
+            self.set_bandwidth_limit(limit_mb)
+        except (OSError, ValueError) as e:
+            logger.warning(f"대역폭 제어 파일을 읽을 수 없습니다: {self.control_file}, 오류: {e}")
+
+    # ----------------- 작업 큐 -----------------
+    def submit(self, video: Dict, download_path: str):
+        """다운로드 작업 추가 (실행 중에도 추가 가능)"""
+        with self._cond:
+            heapq.heappush(self._heap, (self.priority_key(video), next(self._counter), video, download_path))
+            self._cond.notify()
+
+    def _next_job(self, closed: threading.Event, stop: threading.Event) -> Optional[Tuple]:
+        with self._cond:
+            while not self._heap:
+                if closed.is_set() or stop.is_set():
+                    return None
+                self._cond.wait(timeout=0.5)
+            if stop.is_set():
+                return None
+            return heapq.heappop(self._heap)
+
+    def run(self,
+            closed: threading.Event,
+            gate: Optional[Callable[[], bool]] = None,
+            on_complete: Optional[Callable[[Dict, Optional[str]], None]] = None) -> List[Dict]:
+        """작업 큐가 닫히고 모두 처리될 때까지 다운로드 실행
+
+        closed : 더 이상 submit()하지 않을 때 set되는 이벤트
+        gate : 다음 작업을 시작하기 전에 호출. False면 새 작업 시작을 멈춤 (남은 작업은 큐에 유지)
+        on_complete : 영상 하나가 끝날 때마다 (영상 정보, 파일 경로 또는 None)으로 호출
+        """
+        results = []
+        results_lock = threading.Lock()
+        stop = threading.Event()
+
+        def worker():
+            while not stop.is_set():
+                if gate is not None and not gate():
+                    logger.warning("다운로드 시작 조건 불충족, 새 다운로드를 멈춥니다.")
+                    stop.set()
+                    with self._cond:
+                        self._cond.notify_all()
+                    break
+
+                job = self._next_job(closed, stop)
+                if job is None:
+                    break
+                _, _, video, download_path = job
+
+                self._check_control_file()
+                try:
+                    video_path = self.downloader.download_single_video(video, download_path)
+                except Exception as e:
+                    logger.error(f"다운로드 오류 - {video['title']}: {e}")
+                    video_path = None
+
+                if video_path:
+                    with results_lock:
+                        results.append({'info': video, 'path': video_path})
+                if on_complete:
+                    on_complete(video, video_path)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.max_workers)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+        return results
+
+    def drain(self) -> List[Dict]:
+        """아직 시작하지 않은 작업을 우선순위 순서대로 꺼내 반환"""
+        with self._cond:
+            pending = [heapq.heappop(self._heap)[2] for _ in range(len(self._heap))]
+        return pending
+
+    def download_all(self,
+                     videos: List[Dict],
+                     download_path: str,
+                     gate: Optional[Callable[[], bool]] = None,
+                     on_complete: Optional[Callable[[Dict, Optional[str]], None]] = None) -> Tuple[List[Dict], List[Dict]]:
+        """영상 목록을 우선순위대로 다운로드. (다운로드 결과, 시작하지 못한 영상) 반환"""
+        closed = threading.Event()
+        for video in videos:
+            self.submit(video, download_path)
+        closed.set()
+
+        results = self.run(closed, gate=gate, on_complete=on_complete)
+        return results, self.drain()
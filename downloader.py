@@ -5,19 +5,27 @@ yt-dlp를 사용하여 YouTube 영상을 다운로드하는 모듈
 
 import os
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 import yt_dlp
 
 from config import YT_DLP_FORMAT, FORBIDDEN_CHARS, MAX_PATH_LENGTH
+from rate_limiter import TokenBucket
+from retry import get_policy
+from quota_planner import get_budget
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class VideoDownloader:
-    def __init__(self, download_path: str):
-        """다운로더 초기화"""
+    def __init__(self, download_path: str, rate_limiter: Optional[TokenBucket] = None):
+        """다운로더 초기화
+
+        rate_limiter : 여러 다운로드가 함께 사용하는 대역폭 제한 (바이트 단위 토큰 버킷)
+        """
         self.download_path = download_path
+        self.rate_limiter = rate_limiter
+        self.retry_policy = get_policy('download')
         self.setup_download_path()
 
     def setup_download_path(self):
@@ -38,28 +46,49 @@ class VideoDownloader:
             'noplaylist': True,
             'overwrites': False,  # 덮어쓰기 강제 지정
         }
+        ydl_opts['progress_hooks'] = [self._make_throttle_hook()]
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.info(f"다운로드 시작: {video['title']}")
-                info_dict = ydl.extract_info(video['url'], download=True)
-                downloaded_file = ydl.prepare_filename(info_dict)
-
-                if os.path.exists(downloaded_file):
-                    video_info = video.copy()
-                    video_info['downloaded_path'] = downloaded_file
-                    video_info['channel_path'] = channel_path
-                    logger.info(f"다운로드 완료: {downloaded_file}")
-                    return downloaded_file
-                else:
-                    logger.error(f"다운로드된 파일을 찾을 수 없음: {downloaded_file}")
-                    return None
-
+            return self.retry_policy.call(self._download, video, ydl_opts)
         except Exception as e:
             logger.error(f"다운로드 오류 - {video['title']}: {e}")
             return None
 
-    def sanitize_filename(self, filename: str) -> str:
+    def _download(self, video: Dict, ydl_opts: Dict) -> Optional[str]:
+        """yt-dlp로 실제 다운로드 수행 (오류는 재시도 정책이 처리하도록 그대로 발생)"""
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            logger.info(f"다운로드 시작: {video['title']}")
+            info_dict = ydl.extract_info(video['url'], download=True)
+            downloaded_file = ydl.prepare_filename(info_dict)
+
+            if os.path.exists(downloaded_file):
+                logger.info(f"다운로드 완료: {downloaded_file}")
+                return downloaded_file
+            else:
+                logger.error(f"다운로드된 파일을 찾을 수 없음: {downloaded_file}")
+                return None
+
+    def _make_throttle_hook(self):
+        """받은 바이트만큼 토큰을 소비하여 전체 대역폭을 제한하고 다운로드 용량 예산에 집계하는 yt-dlp 진행 훅"""
+        received = {}
+        budget = get_budget()
+
+        def hook(d):
+            if d.get('status') != 'downloading':
+                return
+            filename = d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            delta = downloaded - received.get(filename, 0)
+            received[filename] = downloaded
+            if delta > 0:
+                budget.charge_bytes(delta)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.consume(delta)
+
+        return hook
+
+    @staticmethod
+    def sanitize_filename(filename: str) -> str:
         """Windows 파일명에 사용할 수 없는 문자 제거"""
 
         # 금지된 문자 제거
@@ -4,10 +4,13 @@
 """
 
 import os
+import json
 import shutil
 import logging
 from typing import List, Dict
 
+from config import VIDEO_INFO_FILENAME
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -44,11 +47,12 @@ class FileManager:
 
         return filename
 
-    def organize_video_file(self, file_path: str, video_title: str = None) -> str:
+    def organize_video_file(self, file_path: str, video_title: str = None, target_directory: str = None) -> str:
         """
         다운로드된 영상을 개별 폴더로 이동 및 정리하는 메서드
         - file_path : 기존 영상 파일 경로
         - video_title : 영상 제목 (새 폴더명, 선택사항)
+        - target_directory : 영상 폴더를 만들 상위 경로 (기본값: 영상 파일이 있는 경로)
         반환값 : 정리된 영상 파일 경로
         """
         import os
@@ -137,6 +141,11 @@ class FileManager:
             logger.info(f"실제 파일명 기반 폴더명: {folder_name}")
 
         sanitized_title = folder_name  # 이미 downloader에서 sanitized됨
+
+        # 임시 경로에서 다운로드한 경우 최종 채널 폴더 아래로 이동
+        if target_directory:
+            os.makedirs(target_directory, exist_ok=True)
+            directory = target_directory
         
         # 경로 길이 체크 및 조정
         potential_new_folder = os.path.join(directory, sanitized_title)
@@ -178,3 +187,42 @@ class FileManager:
                 except:
                     pass
             raise
+
+    def save_video_metadata(self, video_folder_path: str, video_info: Dict) -> str:
+        """영상 폴더에 메타데이터(video_info.json) 저장. 저장 경로 반환"""
+        info_path = os.path.join(video_folder_path, VIDEO_INFO_FILENAME)
+        tmp_path = info_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(video_info), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, info_path)
+        return info_path
+
+    def load_video_metadata(self, video_folder_path: str) -> Dict:
+        """영상 폴더의 메타데이터 로드 (없으면 빈 dict)"""
+        info_path = os.path.join(video_folder_path, VIDEO_INFO_FILENAME)
+        if not os.path.exists(info_path):
+            return {}
+        with open(info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def find_processed_videos(self, base_path: str) -> List[Dict]:
+        """base_path 아래에서 메타데이터가 저장된 영상 폴더를 모두 찾아 반환
+
+        반환값 : [{'folder': 영상 폴더 경로, 'info': 메타데이터}, ...]
+        """
+        processed = []
+        for root, dirs, files in os.walk(base_path):
+            if VIDEO_INFO_FILENAME not in files:
+                continue
+            try:
+                info = self.load_video_metadata(root)
+            except (OSError, ValueError) as e:
+                logger.warning(f"메타데이터를 읽을 수 없습니다: {root}, 오류: {e}")
+                continue
+            if info.get('video_id'):
+                processed.append({'folder': root, 'info': info})
+            # 영상 폴더 안의 ResultsDir 등은 탐색하지 않음
+            dirs[:] = []
+
+        logger.info(f"처리된 영상 {len(processed)}개 발견: {base_path}")
+        return processed
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+TXTImages 폴더의 작은 이미지 파일들을 하나의 팩 파일 + 인덱스로 묶는 모듈
+
+팩 파일에는 원본 이미지 파일(PNG/JPEG 등)의 바이트를 그대로 이어 붙이므로 크기는 원본 폴더와 같다.
+읽을 때는 mmap에서 인덱스 위치의 바이트를 잘라 디코딩한다.
+
+사용법:
+    python frame_pack.py [기본경로] [--remove]    # 기존 영상 폴더의 TXTImages를 팩으로 변환
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import mmap
+import shutil
+import logging
+import argparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PACK_FILENAME = 'TXTImages.pack'
+INDEX_FILENAME = 'TXTImages.index.json'
+PACK_VERSION = 2  # 1: 무압축 픽셀 데이터 (읽기만 지원), 2: 인코딩된 이미지 파일 바이트
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# VideoSubFinder 파일명: 시작/끝 시각 (예: 0_00_01_500__0_00_03_200_....png)
+_TIMESTAMP_PATTERN = re.compile(r'^(\d+)_(\d+)_(\d+)_(\d+)__(\d+)_(\d+)_(\d+)_(\d+)')
+
+
+def parse_timestamps(filename: str) -> Tuple[Optional[int], Optional[int]]:
+    """파일명에서 (시작 ms, 끝 ms) 추출. 형식이 다르면 (None, None)"""
+    match = _TIMESTAMP_PATTERN.match(filename)
+    if not match:
+        return None, None
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(g) for g in match.groups())
+    return (((h1 * 60 + m1) * 60 + s1) * 1000 + ms1,
+            ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2)
+
+
+def get_pack_paths(results_dir: str) -> List[str]:
+    """ResultsDir의 팩 파일/인덱스 경로 (존재하는 것만)"""
+    paths = [os.path.join(results_dir, PACK_FILENAME), os.path.join(results_dir, INDEX_FILENAME)]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def has_pack(results_dir: str) -> bool:
+    return len(get_pack_paths(results_dir)) == 2
+
+
+def pack_txt_images(results_dir: str, remove_source: bool = True) -> Optional[str]:
+    """ResultsDir/TXTImages를 팩 파일로 변환. 팩 파일 경로 반환 (이미지가 없으면 None)"""
+    txt_images_dir = os.path.join(results_dir, 'TXTImages')
+    if not os.path.isdir(txt_images_dir):
+        return None
+
+    files = sorted(f for f in os.listdir(txt_images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+    if not files:
+        return None
+
+    pack_path = os.path.join(results_dir, PACK_FILENAME)
+    index_path = os.path.join(results_dir, INDEX_FILENAME)
+
+    frames = []
+    offset = 0
+    with open(pack_path + '.tmp', 'wb') as pack:
+        for name in files:
+            path = os.path.join(txt_images_dir, name)
+            with Image.open(path) as img:
+                width, height = img.size
+                mode = img.mode
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            pack.write(data)
+            start_ms, end_ms = parse_timestamps(name)
+            frames.append({
+                'name': name,
+                'start_ms': start_ms,
+                'end_ms': end_ms,
+                'offset': offset,
+                'size': len(data),
+                'width': width,
+                'height': height,
+                'mode': mode,
+            })
+            offset += len(data)
+
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': PACK_VERSION, 'frames': frames}, f, ensure_ascii=False)
+
+    os.replace(pack_path + '.tmp', pack_path)
+    os.replace(index_path + '.tmp', index_path)
+
+    if remove_source:
+        shutil.rmtree(txt_images_dir)
+
+    logger.info(f"TXTImages 팩 변환 완료: {len(frames)}개 → {pack_path} ({offset / 1024 ** 2:.1f}MB)")
+    return pack_path
+
+
+class FramePack:
+    def __init__(self, results_dir: str):
+        """팩 파일 열기 (mmap, 읽기 전용)"""
+        with open(os.path.join(results_dir, INDEX_FILENAME), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') not in (1, PACK_VERSION):
+            raise ValueError(f"지원하지 않는 팩 버전: {index.get('version')}")
+
+        self.version = index['version']
+        self.frames: List[Dict] = index['frames']
+        self._file = open(os.path.join(results_dir, PACK_FILENAME), 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else None
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                pass  # 아직 참조 중인 이미지가 있으면 GC 후 해제
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+        self._file.close()
+
+    def get_image(self, i: int) -> Image.Image:
+        """i번째 프레임을 PIL 이미지로 반환
+
+        버전 1 팩은 픽셀 데이터를 복사 없이 참조하므로 FramePack을 닫기 전까지만 유효하다.
+        """
+        frame = self.frames[i]
+        buffer = self._view[frame['offset']:frame['offset'] + frame['size']]
+        if self.version == 1:
+            return Image.frombuffer(frame['mode'], (frame['width'], frame['height']), buffer, 'raw', frame['mode'], 0, 1)
+
+        img = Image.open(io.BytesIO(buffer))
+        img.load()
+        return img
+
+    def iter_frames(self) -> Iterator[Tuple[Dict, Image.Image]]:
+        """(인덱스 항목, 이미지)를 순서대로 반환"""
+        for i, frame in enumerate(self.frames):
+            yield frame, self.get_image(i)
+
+
+def convert_existing(base_path: str, remove_source: bool = False) -> int:
+    """base_path 아래 모든 ResultsDir/TXTImages를 팩으로 변환. 변환한 폴더 수 반환"""
+    converted = 0
+    for root, dirs, _ in os.walk(base_path):
+        if os.path.basename(root) == 'ResultsDir' and 'TXTImages' in dirs:
+            try:
+                if pack_txt_images(root, remove_source=remove_source):
+                    converted += 1
+            except (OSError, ValueError) as e:
+                logger.error(f"팩 변환 실패: {root}, 오류: {e}")
+            dirs[:] = []
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='기존 TXTImages 폴더를 팩 파일로 변환')
+    parser.add_argument('base_path', nargs='?', help='변환할 기본 경로 (기본값: BASE_DOWNLOAD_PATH)')
+    parser.add_argument('--remove', action='store_true', help='변환 후 원본 TXTImages 폴더 삭제')
+    args = parser.parse_args()
+
+    base_path = args.base_path
+    if not base_path:
+        from config import BASE_DOWNLOAD_PATH
+        base_path = BASE_DOWNLOAD_PATH
+
+    if not os.path.isdir(base_path):
+        print(f"❌ 경로가 존재하지 않습니다: {base_path}")
+        sys.exit(1)
+
+    count = convert_existing(base_path, remove_source=args.remove)
+    print(f"✅ {count}개 영상의 TXTImages를 팩 파일로 변환했습니다.")
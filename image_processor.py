@@ -8,6 +8,8 @@ import logging
 from typing import List, Dict, Tuple
 from PIL import Image, ImageOps
 
+from frame_pack import FramePack, has_pack
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -19,17 +21,31 @@ class ImageProcessor:
     def combine_images(self, video_folder_path: str) -> str:
         """
         video_folder_path : 영상이 정리된 폴더 경로(제목 폴더)
-        TXTImages 폴더의 모든 이미지를 세로로 합성, 결과 이미지를 video_folder_path에 저장
+        TXTImages 폴더(또는 팩 파일)의 모든 이미지를 세로로 합성, 결과 이미지를 video_folder_path에 저장
         """
-        txt_images_path = os.path.join(video_folder_path, 'ResultsDir', 'TXTImages')
+        results_dir = os.path.join(video_folder_path, 'ResultsDir')
+        if has_pack(results_dir):
+            # 팩 파일은 mmap에서 프레임별로 잘라 디코딩
+            with FramePack(results_dir) as pack:
+                images = [img for _, img in pack.iter_frames()]
+                result_path = self._save_combined(images, video_folder_path, results_dir)
+                images.clear()  # 버전 1 팩은 mmap을 닫을 수 있도록 버퍼 참조 해제
+            return result_path
+
+        txt_images_path = os.path.join(results_dir, 'TXTImages')
         images = []
-        for file in sorted(os.listdir(txt_images_path)):
-            if file.endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-                img = Image.open(os.path.join(txt_images_path, file))
-                images.append(img)
+        if os.path.isdir(txt_images_path):
+            for file in sorted(os.listdir(txt_images_path)):
+                if file.endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+                    img = Image.open(os.path.join(txt_images_path, file))
+                    images.append(img)
+
+        return self._save_combined(images, video_folder_path, txt_images_path)
 
+    def _save_combined(self, images: List[Image.Image], video_folder_path: str, source_path: str) -> str:
+        """이미지들을 세로로 이어 붙여 combined_result.png로 저장"""
         if not images:
-            self.logger.warning("합성할 이미지가 없음: %s", txt_images_path)
+            logger.warning("합성할 이미지가 없음: %s", source_path)
             return None
 
         # 가장 넓은 이미지 기준으로
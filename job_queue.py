@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+여러 워커(프로세스/장비)가 단계별 작업을 나눠 처리하기 위한 공유 작업 큐 모듈
+
+SQLite 파일 하나를 공유 경로에 두고 사용한다. 네트워크 파일시스템에서는 WAL 모드가
+안전하지 않으므로 기본 저널 모드와 BEGIN IMMEDIATE 잠금만 사용한다.
+다른 큐 서비스로 바꿀 때는 JobQueue와 같은 메서드(enqueue/lease/heartbeat/complete/fail)만 맞추면 된다.
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 처리 순서대로 나열한 단계 (다운로드 단계는 파일 정리와 썸네일 저장까지 포함)
+STAGES = ['download', 'extract', 'combine']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (video_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (status, stage, priority);
+"""
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, path: str = config.JOB_QUEUE_PATH,
+                 lease_seconds: int = config.JOB_LEASE_SECONDS,
+                 max_attempts: int = config.JOB_MAX_ATTEMPTS):
+        """작업 큐 초기화 (파일이 없으면 생성)"""
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        queue_dir = os.path.dirname(path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (하트비트 스레드와 작업 스레드가 연결을 공유하지 않도록)"""
+        if not hasattr(self._local, 'conn'):
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return self._local.conn
+
+    def _transaction(self, func: Callable[[sqlite3.Connection], object]):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = func(conn)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    # ----------------- 코디네이터 -----------------
+    def enqueue(self, video_id: str, payload: Dict, stage: str = 'download', priority: float = 0) -> bool:
+        """작업 추가 (같은 영상/단계가 이미 있으면 무시). 추가되었으면 True"""
+        def insert(conn):
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (video_id, stage, priority, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (video_id, stage, priority, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+            return cursor.rowcount > 0
+        return self._transaction(insert)
+
+    # ----------------- 워커 -----------------
+    def _requeue_expired(self, conn: sqlite3.Connection):
+        """임대 시간이 지난 작업(죽은 워커)을 다시 대기 상태로 돌림"""
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', worker_id = NULL, error = 'lease expired', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts)
+        )
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'pending', worker_id = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+        if cursor.rowcount:
+            logger.warning(f"임대 만료된 작업 {cursor.rowcount}개를 다시 대기열에 넣었습니다.")
+
+    def lease(self, worker_id: str, stages: List[str]) -> Optional[Dict]:
+        """지정한 단계 중 우선순위가 가장 높은 대기 작업 하나를 임대"""
+        placeholders = ','.join('?' * len(stages))
+
+        def take(conn):
+            self._requeue_expired(conn)
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE status = 'pending' AND stage IN ({placeholders}) "
+                f"ORDER BY priority, id LIMIT 1",
+                stages
+            ).fetchone()
+            if row is None:
+                return None
+
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row['id'])
+            )
+            job = dict(row)
+            job['payload'] = json.loads(job['payload'])
+            job['attempts'] += 1
+            return job
+
+        return self._transaction(take)
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """임대 연장. 임대를 잃었으면(만료 후 다른 워커가 가져감) False"""
+        def extend(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount > 0
+        return self._transaction(extend)
+
+    def complete(self, job: Dict, worker_id: str, next_payload: Optional[Dict] = None) -> bool:
+        """작업 완료 처리 후 다음 단계 작업 추가 (같은 트랜잭션). 임대를 잃었으면 False"""
+        def finish(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', lease_expires = NULL, error = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (time.time(), job['id'], worker_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            stage_index = STAGES.index(job['stage'])
+            if next_payload is not None and stage_index + 1 < len(STAGES):
+                conn.execute(
+                    "INSERT OR IGNORE INTO jobs (video_id, stage, priority, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job['video_id'], STAGES[stage_index + 1], job['priority'],
+                     json.dumps(next_payload, ensure_ascii=False), time.time())
+                )
+            return True
+        return self._transaction(finish)
+
+    def fail(self, job: Dict, worker_id: str, error: str) -> bool:
+        """작업 실패 처리. 시도 횟수가 남았으면 다시 대기열로. 임대를 잃었으면 False"""
+        status = 'pending' if job['attempts'] < self.max_attempts else 'failed'
+
+        def mark(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (status, error[:1000], time.time(), job['id'], worker_id)
+            )
+            return cursor.rowcount > 0
+        return self._transaction(mark)
+
+    def get_counts(self) -> Dict[str, Dict[str, int]]:
+        """단계별/상태별 작업 수"""
+        counts = {stage: {} for stage in STAGES}
+        rows = self._connect().execute("SELECT stage, status, COUNT(*) AS n FROM jobs GROUP BY stage, status")
+        for row in rows:
+            counts.setdefault(row['stage'], {})[row['status']] = row['n']
+        return counts
+
+    def has_unfinished(self, stages: List[str]) -> bool:
+        """지정한 단계나 그 앞 단계에 아직 끝나지 않은 작업이 있는지"""
+        upstream = STAGES[:max(STAGES.index(s) for s in stages) + 1]
+        placeholders = ','.join('?' * len(upstream))
+        row = self._connect().execute(
+            f"SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased') AND stage IN ({placeholders})",
+            upstream
+        ).fetchone()
+        return row[0] > 0
+
+
+class QueueWorker:
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[Dict], Optional[Dict]]],
+                 stages: Optional[List[str]] = None, worker_id: Optional[str] = None):
+        """큐 워커 초기화
+
+        handlers : {단계: payload를 받아 다음 단계 payload를 반환하는 함수}
+                   None을 반환하면 다음 단계 작업을 만들지 않는다.
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.stages = stages or list(handlers)
+        self.worker_id = worker_id or get_worker_id()
+        self._stop = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat_loop(self, job: Dict, done: threading.Event):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not done.wait(interval):
+            try:
+                if not self.queue.heartbeat(job['id'], self.worker_id):
+                    logger.warning(f"작업 임대를 잃었습니다: {job['stage']} {job['video_id']}")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"하트비트 실패: {e}")
+
+    def run_one(self, job: Dict):
+        """임대한 작업 하나 처리 (처리 중에는 하트비트로 임대 연장)"""
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            logger.info(f"[{self.worker_id}] {job['stage']} 시작: {job['video_id']} (시도 {job['attempts']})")
+            next_payload = self.handlers[job['stage']](job['payload'])
+        except Exception as e:
+            done.set()
+            self.failed += 1
+            logger.error(f"[{self.worker_id}] {job['stage']} 실패: {job['video_id']}, 오류: {e}")
+            self.queue.fail(job, self.worker_id, str(e))
+            return
+        done.set()
+
+        if self.queue.complete(job, self.worker_id, next_payload):
+            self.processed += 1
+        else:
+            logger.warning(f"임대가 만료되어 결과를 반영하지 못했습니다: {job['stage']} {job['video_id']}")
+
+    def run(self, exit_when_done: bool = False, poll_interval: float = config.JOB_POLL_INTERVAL):
+        """작업 처리 루프 (stop() 또는 KeyboardInterrupt까지)"""
+        logger.info(f"워커 시작: {self.worker_id}, 단계: {self.stages}")
+        while not self._stop.is_set():
+            job = self.queue.lease(self.worker_id, self.stages)
+            if job is None:
+                if exit_when_done and not self.queue.has_unfinished(self.stages):
+                    break
+                self._stop.wait(poll_interval)
+                continue
+            self.run_one(job)
+
+        logger.info(f"워커 종료: 완료 {self.processed}개, 실패 {self.failed}개")
@@ -13,8 +13,11 @@ YouTube 쇼츠 다운로드 및 처리 메인 프로그램
 
 import sys
 import os
+import json
+import time
 import argparse
 import logging
+import threading
 from datetime import datetime
 from typing import Optional
 
@@ -26,9 +29,20 @@ load_dotenv()
 import config
 from youtube_api import YouTubeAPI
 from downloader import VideoDownloader as Downloader
+from download_scheduler import DownloadScheduler
 from file_manager import FileManager
 from subtitle_extractor import SubtitleExtractor
 from image_processor import ImageProcessor
+from video_filter import VideoFilter
+from workspace import WorkspaceManager
+from retry import get_retry_stats
+from stats_refresher import StatsRefresher
+from thumbnail_fetcher import ThumbnailFetcher
+from watch_daemon import WatchDaemon
+from download_scheduler import PRIORITY_KEYS
+from job_queue import JobQueue, QueueWorker, STAGES
+from profiler import StageProfiler
+from quota_planner import QuotaPlanner, BudgetExceededError, get_budget
 
 def setup_logging() -> logging.Logger:
     """로깅 설정"""
@@ -86,6 +100,559 @@ def get_user_input() -> tuple[str, str]:
 
     return channel_url, date_input
 
+def create_components(profiler: Optional[StageProfiler] = None) -> dict:
+    """다운로드 이후 단계에서 사용하는 컴포넌트 생성 (감시 모드에서는 계속 재사용)"""
+    downloader = Downloader(config.BASE_DOWNLOAD_PATH)
+    return {
+        'profiler': profiler or StageProfiler(),
+        'scheduler': DownloadScheduler(downloader),
+        'file_manager': FileManager(),
+        'subtitle_extractor': SubtitleExtractor(),
+        'image_processor': ImageProcessor(),
+        'workspace': WorkspaceManager() if config.WORKSPACE_ENABLED else None,
+        'thumbnail_fetcher': ThumbnailFetcher() if config.THUMBNAIL_ENABLED else None,
+    }
+
+def download_videos(videos_info: list, channel_path: str, components: dict, logger: logging.Logger) -> tuple[list, list]:
+    """영상 다운로드 단계. (다운로드된 영상 목록, 공간 부족으로 미룬 영상 목록) 반환"""
+    scheduler = components['scheduler']
+    workspace = components.get('workspace')
+    budget = get_budget()
+    download_path = workspace.get_staging_path(channel_path) if workspace else channel_path
+
+    print(f"\n⬇️ 영상 다운로드 시작...")
+
+    # 디스크 공간이 부족하면 확보될 때까지 대기
+    if workspace and not workspace.wait_for_space():
+        print(f"  ❌ 디스크 공간이 부족하여 남은 영상 처리를 중단합니다.")
+        return [], videos_info
+
+    finished = [0]
+
+    def report(video_info, video_path):
+        finished[0] += 1
+        print(f"  📥 [{finished[0]}/{len(videos_info)}] {video_info['title'][:50]}...")
+        if video_path:
+            logger.info(f"다운로드 완료: {video_info['title']}")
+        else:
+            logger.warning(f"다운로드 실패: {video_info['title']}")
+
+    def gate():
+        return budget.allows_download() and (workspace.has_space() if workspace else True)
+
+    # 우선순위 순서로 다운로드, 공간이 부족해지면 받은 영상부터 처리하고 나머지는 다음 배치로 미룸
+    # 다운로드 용량 예산을 모두 쓰면 새 다운로드를 시작하지 않음
+    downloaded_videos, deferred = scheduler.download_all(
+        videos_info,
+        download_path,
+        gate=gate,
+        on_complete=report
+    )
+    if deferred and not budget.allows_download():
+        print(f"  ⏸️ {budget.exhausted_reason}: {len(deferred)}개 영상은 다운로드하지 않습니다.")
+    elif deferred:
+        print(f"  ⏸️ 디스크 공간 부족: {len(deferred)}개 영상은 정리 후 다운로드합니다.")
+
+    print(f"✅ {len(downloaded_videos)}개 영상 다운로드 완료!")
+    return downloaded_videos, deferred
+
+def organize_videos(downloaded_videos: list, channel_path: str, components: dict, logger: logging.Logger) -> list:
+    """파일 정리 단계 (각 영상을 개별 폴더로 이동)"""
+    file_manager = components['file_manager']
+    workspace = components.get('workspace')
+
+    print(f"\n📁 파일 정리 중...")
+    organized_videos = []
+
+    profiler = components['profiler']
+
+    for video_data in downloaded_videos:
+        try:
+            with profiler.call('organize', video_data['info']['title']):
+                organized_path = file_manager.organize_video_file(
+                    video_data['path'], 
+                    video_data['info']['title'],
+                    target_directory=channel_path
+                )
+            save_metadata(file_manager, os.path.dirname(organized_path), video_data['info'], logger)
+            organized_videos.append({
+                'info': video_data['info'],
+                'path': organized_path
+            })
+            if workspace:
+                workspace.track(os.path.dirname(organized_path))
+            logger.info(f"파일 정리 완료: {video_data['info']['title']}")
+
+        except Exception as e:
+            logger.error(f"파일 정리 오류 - {video_data['info']['title']}: {e}")
+
+    print(f"✅ {len(organized_videos)}개 영상 파일 정리 완료!")
+    return organized_videos
+
+def save_metadata(file_manager: FileManager, video_folder_path: str, video_info: dict, logger: logging.Logger):
+    """영상 폴더에 메타데이터 저장 (실패해도 영상 처리는 계속 진행)"""
+    try:
+        file_manager.save_video_metadata(video_folder_path, video_info)
+    except OSError as e:
+        logger.warning(f"메타데이터 저장 실패 - {video_info['title']}: {e}")
+
+def fetch_thumbnails(organized_videos: list, components: dict, logger: logging.Logger) -> int:
+    """썸네일 저장 단계. 저장(또는 최신 상태 확인)된 영상 수 반환"""
+    thumbnail_fetcher = components.get('thumbnail_fetcher')
+    if not thumbnail_fetcher or not organized_videos:
+        return 0
+
+    print(f"\n🏞️ 썸네일 저장 중...")
+    result = thumbnail_fetcher.fetch_all([
+        {'url': video_data['info'].get('thumbnail_url'), 'folder': os.path.dirname(video_data['path'])}
+        for video_data in organized_videos
+    ])
+    print(f"✅ 썸네일 {result['downloaded']}개 저장, {result['not_modified']}개 변경 없음"
+          + (f", {result['failed']}개 실패" if result['failed'] else ""))
+    return result['downloaded'] + result['not_modified']
+
+def extract_subtitles(organized_videos: list, components: dict, logger: logging.Logger) -> list:
+    """자막 추출 단계. 오류 없이 끝난 영상 목록 반환"""
+    subtitle_extractor = components['subtitle_extractor']
+    workspace = components.get('workspace')
+    profiler = components['profiler']
+
+    print(f"\n🔤 자막 추출 중...")
+    subtitle_completed = 0
+    extracted_videos = []
+
+    for video_data in organized_videos:
+        try:
+            with profiler.call('extract', video_data['info']['title']):
+                subtitle_extractor.extract_subtitles(video_data['path'])
+            subtitle_completed += 1
+            extracted_videos.append(video_data)
+            logger.info(f"자막 추출 완료: {video_data['info']['title']}")
+            print(f"  ✅ [{subtitle_completed}/{len(organized_videos)}] 자막 추출 완료")
+
+        except Exception as e:
+            logger.error(f"자막 추출 오류 - {video_data['info']['title']}: {e}")
+            print(f"  ❌ 자막 추출 실패: {video_data['info']['title'][:30]}...")
+
+        finally:
+            # 추출 이미지(RGBImages/TXTImages)까지 작업 공간 사용량에 반영
+            if workspace:
+                workspace.track(os.path.dirname(video_data['path']))
+
+    return extracted_videos
+
+def combine_images(organized_videos: list, components: dict, logger: logging.Logger) -> tuple[int, list]:
+    """이미지 합성 단계 (성공 시 작업 공간 정리)
+
+    반환값 : (합성 성공 수, 오류 없이 끝난 영상 목록 - 합성할 자막 이미지가 없던 영상 포함)
+    """
+    image_processor = components['image_processor']
+    workspace = components.get('workspace')
+    profiler = components['profiler']
+
+    print(f"\n🖼️ 이미지 합성 중...")
+    image_completed = 0
+    finished_videos = []
+
+    for video_data in organized_videos:
+        video_folder_path = os.path.dirname(video_data['path'])
+        try:
+            with profiler.call('combine', video_data['info']['title']):
+                result_path = image_processor.combine_images(video_folder_path)
+            if result_path:
+                image_completed += 1
+                logger.info(f"이미지 합성 완료: {video_data['info']['title']}")
+                print(f"  ✅ [{image_completed}/{len(organized_videos)}] 이미지 합성 완료")
+                if workspace:
+                    workspace.cleanup_after_combine(video_folder_path, result_path)
+            else:
+                print(f"  ⚠️ 합성할 이미지가 없음: {video_data['info']['title'][:30]}...")
+            finished_videos.append(video_data)
+
+        except Exception as e:
+            logger.error(f"이미지 합성 오류 - {video_data['info']['title']}: {e}")
+            print(f"  ❌ 이미지 합성 실패: {video_data['info']['title'][:30]}...")
+
+        finally:
+            # 정리하지 못한 폴더도 더 이상 줄어들지 않으므로 작업 공간 예산에서 제외
+            if workspace:
+                workspace.release(video_folder_path)
+
+    return image_completed, finished_videos
+
+def process_downloaded(downloaded_videos: list, channel_path: str, components: dict,
+                       logger: logging.Logger, stats: dict):
+    """다운로드된 영상에 대해 파일 정리 → 썸네일 저장 → 자막 추출 → 이미지 합성 실행 (stats 누적)
+
+    모든 단계를 오류 없이 마친 영상의 ID는 stats['processed_ids']에 추가한다.
+    """
+    profiler = components['profiler']
+
+    with profiler.stage('organize'):
+        organized_videos = organize_videos(downloaded_videos, channel_path, components, logger)
+    stats['organized'] += len(organized_videos)
+    # 다음 실행 비용 추정(--dry-run)에 사용할 처리량
+    stats['bytes'] += sum(os.path.getsize(v['path']) for v in organized_videos if os.path.exists(v['path']))
+    with profiler.stage('thumbnail'):
+        stats['thumbnails'] += fetch_thumbnails(organized_videos, components, logger)
+    with profiler.stage('extract'):
+        started = time.monotonic()
+        extracted_videos = extract_subtitles(organized_videos, components, logger)
+        stats['extract_seconds'] += time.monotonic() - started
+    stats['subtitles'] += len(extracted_videos)
+    with profiler.stage('combine'):
+        combined_count, finished_videos = combine_images(organized_videos, components, logger)
+    stats['combined'] += combined_count
+
+    extracted_ids = {video_data['info']['video_id'] for video_data in extracted_videos}
+    stats['processed_ids'].extend(video_data['info']['video_id'] for video_data in finished_videos
+                                  if video_data['info']['video_id'] in extracted_ids)
+
+def process_video_stream(records, video_filter: VideoFilter, channel_path: str,
+                         components: dict, logger: logging.Logger) -> tuple[dict, int, int, bool]:
+    """검색 결과 페이지가 도착하는 대로 다운로드를 시작하고, 끝나면 나머지 단계 실행
+
+    할당량이 소진되면 검색만 멈추고 이미 받기 시작한 영상은 끝까지 처리한다.
+    반환값 : (단계별 처리 수, 발견된 쇼츠 수, 필터 통과 수, 검색 완료 여부)
+    """
+    scheduler = components['scheduler']
+    profiler = components['profiler']
+    stats = {'downloaded': 0, 'organized': 0, 'thumbnails': 0, 'subtitles': 0, 'combined': 0,
+             'bytes': 0, 'extract_seconds': 0.0, 'processed_ids': []}
+    discovered_count = accepted_count = 0
+    discovery_done = True
+
+    closed = threading.Event()
+    downloaded_videos = []
+    finished = [0]
+
+    def report(video_info, video_path):
+        finished[0] += 1
+        print(f"  📥 [{finished[0]}/{accepted_count}] {video_info['title'][:50]}...")
+        if video_path:
+            logger.info(f"다운로드 완료: {video_info['title']}")
+        else:
+            logger.warning(f"다운로드 실패: {video_info['title']}")
+
+    runner = threading.Thread(
+        target=lambda: downloaded_videos.extend(scheduler.run(closed, on_complete=report)),
+        daemon=True
+    )
+
+    print(f"\n⬇️ 검색과 동시에 영상 다운로드 시작...")
+    with profiler.stage('discovery_download'):
+        runner.start()
+        try:
+            for record in records:
+                discovered_count += 1
+                if video_filter.is_active() and video_filter.check(record):
+                    continue
+                accepted_count += 1
+                scheduler.submit(record, channel_path)
+        except BudgetExceededError as e:
+            print(f"  ⏸️ {e}: 검색을 중단합니다 ({discovered_count}개 발견).")
+            discovery_done = False
+        except BaseException:
+            # 중단 시 아직 시작하지 않은 다운로드는 버림
+            scheduler.drain()
+            raise
+        finally:
+            closed.set()
+            runner.join()
+
+    print(f"✅ 쇼츠 {discovered_count}개 발견, {accepted_count}개 필터 통과, {len(downloaded_videos)}개 영상 다운로드 완료!")
+    stats['downloaded'] = len(downloaded_videos)
+    if downloaded_videos:
+        process_downloaded(downloaded_videos, channel_path, components, logger, stats)
+    return stats, discovered_count, accepted_count, discovery_done
+
+def process_videos(videos_info: list, channel_path: str, components: dict, logger: logging.Logger) -> dict:
+    """다운로드 → 파일 정리 → 썸네일 저장 → 자막 추출 → 이미지 합성 실행
+
+    작업 공간 관리자가 있으면 WORKSPACE_BATCH_SIZE개씩 끝까지 처리하고
+    중간 산출물을 정리한 뒤 다음 배치를 다운로드한다.
+    디스크 공간이나 다운로드 용량 예산이 부족해 시작하지 못한 영상은 stats['remaining']으로,
+    끝까지 처리한 영상의 ID는 stats['processed_ids']로 반환한다.
+    """
+    stats = {'downloaded': 0, 'organized': 0, 'thumbnails': 0, 'subtitles': 0, 'combined': 0,
+             'bytes': 0, 'extract_seconds': 0.0, 'processed_ids': []}
+    workspace = components.get('workspace')
+    profiler = components['profiler']
+    batch_size = config.WORKSPACE_BATCH_SIZE if workspace else len(videos_info)
+    # 배치 안에서만이 아니라 전체 목록을 우선순위 순으로 나눠, 중단되어도 중요한 영상부터 처리되도록 함
+    pending = sorted(videos_info, key=PRIORITY_KEYS[config.DOWNLOAD_PRIORITY])
+
+    while pending:
+        batch, pending = pending[:batch_size], pending[batch_size:]
+        if workspace:
+            print(f"\n📦 배치 처리: {len(batch)}개 (남은 영상 {len(pending)}개)")
+
+        with profiler.stage('download'):
+            downloaded_videos, deferred = download_videos(batch, channel_path, components, logger)
+        pending = deferred + pending
+        if not downloaded_videos and deferred:
+            break
+
+        stats['downloaded'] += len(downloaded_videos)
+        process_downloaded(downloaded_videos, channel_path, components, logger, stats)
+
+    stats['remaining'] = pending
+    return stats
+
+def print_retry_stats():
+    """단계별 재시도 통계 출력"""
+    retry_stats = get_retry_stats()
+    if not any(stats.get('retries') or stats.get('failures') for stats in retry_stats.values()):
+        return
+
+    print(f"🔁 재시도 통계:")
+    for stage, stats in retry_stats.items():
+        errors = {k.split(':', 1)[1]: v for k, v in stats.items() if k.startswith('error:')}
+        print(f"  • {stage}: 호출 {stats.get('calls', 0)}회, 재시도 {stats.get('retries', 0)}회, "
+              f"최종 실패 {stats.get('failures', 0)}회 {errors if errors else ''}")
+
+def discover_videos(youtube_api: YouTubeAPI, channel_id: str, cutoff_date: str,
+                    page_token: Optional[str] = None) -> tuple[list, bool]:
+    """쇼츠 영상 목록 수집. (영상 목록, 검색 완료 여부) 반환
+
+    할당량 예산을 모두 쓰면 그때까지 찾은 영상만 반환하고, 중단 지점은 youtube_api.last_page_token에 남는다.
+    """
+    videos_info = []
+    try:
+        for record in youtube_api.iter_shorts_videos(channel_id, cutoff_date, page_token=page_token):
+            videos_info.append(record.to_dict())
+    except BudgetExceededError as e:
+        print(f"  ⏸️ {e}: 검색을 중단합니다 ({len(videos_info)}개 발견).")
+        return videos_info, False
+    return videos_info, True
+
+def plan_run(youtube_api: YouTubeAPI, planner: QuotaPlanner, channel_url: str, cutoff_date: str):
+    """--dry-run: 검색/다운로드 없이 API 할당량, 영상 수, 다운로드 용량, 추출 시간 추정"""
+    budget = get_budget()
+    units_before = budget.used_units
+    print(f"\n🧮 {channel_url} 채널의 실행 비용을 추정 중...")
+
+    channel_id = youtube_api.extract_channel_id(channel_url)
+    if channel_id is None:
+        print("❌ 유효한 채널 ID를 가져오지 못했습니다. URL을 다시 확인하세요.")
+        return
+
+    # 채널 ID/이름/통계는 기록 파일에 캐시되어 실제 실행에서는 다시 조회하지 않음
+    planner.get_channel_statistics(youtube_api, channel_url, channel_id)
+    planner.remember_channel(channel_url, channel_id=channel_id,
+                             channel_name=youtube_api.get_channel_name(channel_url))
+    plan = planner.estimate(channel_url, cutoff_date, budget)
+
+    print("\n" + "="*60)
+    print(f"🧮 실행 계획 (--dry-run): {planner.get_channel(channel_url).get('channel_name')}")
+    print("="*60)
+    print(planner.format_plan(plan))
+    print(f"\n💸 추정에 사용한 API: {budget.used_units - units_before} units")
+
+def save_run_state(state_file: str, state: dict):
+    """예산 소진 등으로 중단한 작업을 --resume용으로 저장"""
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = state_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, state_file)
+
+def load_run_state(state_file: str) -> Optional[dict]:
+    """--resume으로 이어서 실행할 작업 불러오기"""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def refresh_stats(logger: logging.Logger, channel_url: Optional[str] = None):
+    """처리된 영상들의 통계를 일괄 갱신하는 모드
+
+    channel_url이 있으면 먼저 그 채널 폴더 중 메타데이터가 없는(이전 버전에서 처리한) 영상 폴더를 채운다.
+    """
+    refresher = StatsRefresher()
+    try:
+        if channel_url:
+            print(f"\n🗂️ 메타데이터가 없는 영상 폴더 확인 중: {channel_url}")
+            backfill = refresher.backfill_metadata(channel_url)
+            print(f"✅ 메타데이터 없는 폴더 {backfill['folders']}개 중 {backfill['filled']}개 채움")
+
+        print(f"\n📈 처리된 영상 통계 갱신 중: {config.BASE_DOWNLOAD_PATH}")
+        result = refresher.refresh(config.BASE_DOWNLOAD_PATH)
+    except KeyboardInterrupt:
+        print("\n\n⏹️ 사용자가 프로그램을 중단했습니다.")
+        logger.info("사용자 중단")
+        return
+    except BudgetExceededError as e:
+        print(f"\n⏸️ {e}: 할당량이 초기화된 뒤 다시 실행하세요.")
+        logger.warning(f"예산 소진: {e}")
+        return
+    finally:
+        QuotaPlanner().record_usage(get_budget())
+
+    if not result['videos']:
+        print(f"❌ 메타데이터({config.VIDEO_INFO_FILENAME})가 저장된 영상 폴더가 없습니다.")
+        print('💡 이전에 처리한 영상은 채널 URL을 함께 지정하면 메타데이터를 채웁니다: '
+              'python main.py --refresh-stats "https://www.youtube.com/@채널명"')
+        return
+
+    print(f"✅ {result['updated']}/{result['videos']}개 영상 통계 갱신 완료!")
+    print(f"📁 시계열 기록: {config.STATS_HISTORY_FILE}")
+    print_retry_stats()
+
+def write_profile(profiler: StageProfiler):
+    """--profile: 측정을 끝내고 보고서 저장 및 요약 출력"""
+    if profiler.enabled:
+        profiler.stop()
+        profiler.write_reports()
+        profiler.print_summary()
+
+def run_watch(watchlist_file: str, logger: logging.Logger, profiler: StageProfiler):
+    """감시 목록의 채널을 주기적으로 확인하는 상주 모드
+
+    API 클라이언트, 채널 캐시, 다운로드/썸네일 작업자 등은 한 번만 만들어 계속 재사용한다.
+    """
+    if not os.path.exists(watchlist_file):
+        print(f"❌ 감시 목록 파일이 없습니다: {watchlist_file}")
+        print('💡 예시: [{"url": "https://www.youtube.com/@채널명", "interval": 1800}]')
+        return
+
+    logger.info("컴포넌트 초기화 중...")
+    components = create_components(profiler)
+
+    def process(videos_info, channel_path):
+        print(f"\n🆕 새 쇼츠 {len(videos_info)}개 처리: {channel_path}")
+        return process_videos(videos_info, channel_path, components, logger)
+
+    daemon = WatchDaemon(YouTubeAPI(), VideoFilter(), process, watchlist_file=watchlist_file)
+    print(f"\n👀 감시 모드 시작: {watchlist_file} (Ctrl+C로 종료)")
+    profiler.start()
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("\n\n⏹️ 감시 모드를 종료합니다.")
+        logger.info("사용자 중단")
+    finally:
+        daemon.save_state()
+        QuotaPlanner().record_usage(get_budget())
+        if components['thumbnail_fetcher']:
+            components['thumbnail_fetcher'].close()
+        print_retry_stats()
+        write_profile(profiler)
+
+def enqueue_videos(videos_info: list, channel_path: str, queue_path: str, logger: logging.Logger):
+    """발견한 영상을 공유 작업 큐의 다운로드 단계에 등록"""
+    queue = JobQueue(queue_path)
+    priority_key = PRIORITY_KEYS[config.DOWNLOAD_PRIORITY]
+
+    added = 0
+    for video_info in videos_info:
+        payload = {'info': video_info, 'channel_path': channel_path}
+        if queue.enqueue(video_info['video_id'], payload, priority=priority_key(video_info)):
+            added += 1
+
+    logger.info(f"작업 큐 등록: {added}/{len(videos_info)}개 ({queue_path})")
+    print(f"\n📮 {added}개 영상을 작업 큐에 등록했습니다 (이미 등록된 영상 {len(videos_info) - added}개 제외)")
+    print(f"📁 작업 큐: {queue_path}")
+    print_queue_counts(queue)
+
+def print_queue_counts(queue: JobQueue):
+    """작업 큐의 단계별 상태 출력"""
+    for stage, counts in queue.get_counts().items():
+        summary = ', '.join(f"{status} {n}" for status, n in sorted(counts.items())) or '없음'
+        print(f"  • {stage}: {summary}")
+
+def create_job_handlers(components: dict, logger: logging.Logger) -> dict:
+    """작업 큐 단계별 처리 함수 (payload를 받아 다음 단계 payload 반환)"""
+    file_manager = components['file_manager']
+    workspace = components['workspace']
+
+    def download(payload):
+        video_info, channel_path = payload['info'], payload['channel_path']
+        if workspace and not workspace.wait_for_space():
+            raise RuntimeError("디스크 공간 부족")
+
+        download_path = workspace.get_staging_path(channel_path) if workspace else channel_path
+        video_path = components['scheduler'].downloader.download_single_video(video_info, download_path)
+        if not video_path:
+            raise RuntimeError(f"다운로드 실패: {video_info['title']}")
+
+        organized_path = file_manager.organize_video_file(video_path, video_info['title'], target_directory=channel_path)
+        video_folder_path = os.path.dirname(organized_path)
+        save_metadata(file_manager, video_folder_path, video_info, logger)
+        if workspace:
+            workspace.track(video_folder_path)
+
+        thumbnail_fetcher = components['thumbnail_fetcher']
+        if thumbnail_fetcher and video_info.get('thumbnail_url'):
+            try:
+                thumbnail_fetcher.fetch(video_info['thumbnail_url'], video_folder_path)
+            except Exception as e:
+                logger.warning(f"썸네일 저장 실패 - {video_info['title']}: {e}")
+
+        return {'info': video_info, 'path': organized_path}
+
+    def extract(payload):
+        try:
+            extracted = components['subtitle_extractor'].extract_subtitles(payload['path'])
+        finally:
+            if workspace:
+                workspace.track(os.path.dirname(payload['path']))
+        if not extracted:
+            logger.warning(f"추출된 자막이 없어 합성을 건너뜁니다: {payload['info']['title']}")
+            return None
+        return payload
+
+    def combine(payload):
+        video_folder_path = os.path.dirname(payload['path'])
+        try:
+            result_path = components['image_processor'].combine_images(video_folder_path)
+            if result_path and workspace:
+                workspace.cleanup_after_combine(video_folder_path, result_path)
+        finally:
+            if workspace:
+                workspace.release(video_folder_path)
+        return None
+
+    profiler = components['profiler']
+
+    def profiled(stage, handler):
+        def run(payload):
+            with profiler.stage(stage), profiler.call(stage, payload['info']['title']):
+                return handler(payload)
+        return run
+
+    handlers = {'download': download, 'extract': extract, 'combine': combine}
+    return {stage: profiled(stage, handler) for stage, handler in handlers.items()}
+
+def run_worker(queue_path: str, stages: list, exit_when_done: bool, logger: logging.Logger,
+               profiler: StageProfiler):
+    """공유 작업 큐에서 작업을 임대하여 처리하는 워커 모드"""
+    queue = JobQueue(queue_path)
+    components = create_components(profiler)
+    if components['workspace']:
+        # 작업 공간 예산은 이 프로세스가 추적한 폴더 기준인데, 단계가 여러 워커로 나뉘면
+        # 다운로드 워커는 합성 후 정리를 보지 못해 사용량이 줄지 않으므로 남은 용량 기준만 적용
+        components['workspace'] = WorkspaceManager(disk_budget_gb=0)
+    worker = QueueWorker(queue, create_job_handlers(components, logger), stages=stages)
+
+    print(f"\n🛠️ 워커 시작: {worker.worker_id} (단계: {', '.join(stages)}, Ctrl+C로 종료)")
+    profiler.start()
+    try:
+        worker.run(exit_when_done=exit_when_done)
+    except KeyboardInterrupt:
+        print("\n\n⏹️ 워커를 종료합니다. 처리 중이던 작업은 임대 만료 후 다른 워커가 이어받습니다.")
+        logger.info("사용자 중단")
+    finally:
+        if components['thumbnail_fetcher']:
+            components['thumbnail_fetcher'].close()
+        write_profile(profiler)
+
+    print(f"📊 처리 완료 {worker.processed}개, 실패 {worker.failed}개")
+    print_queue_counts(queue)
+    print_retry_stats()
+
 def main():
     """메인 실행 함수"""
     logger = setup_logging()
@@ -102,11 +669,36 @@ def main():
 예시:
   %(prog)s                                          # 대화형 모드
   %(prog)s "https://www.youtube.com/@example" "2024-01-01"  # 배치 모드
+  %(prog)s --refresh-stats                          # 처리된 영상 통계 갱신
+  %(prog)s --refresh-stats "https://www.youtube.com/@example"  # 메타데이터 없는 기존 폴더도 채운 뒤 갱신
+  %(prog)s --profile "https://www.youtube.com/@example" "2024-01-01"  # 프로파일링
+  %(prog)s --dry-run "https://www.youtube.com/@example" "2024-01-01"  # 실행 비용 추정
+  %(prog)s --resume                                 # 예산 소진으로 중단한 작업 이어서 실행
+  %(prog)s --watch watchlist.json                   # 감시(데몬) 모드
+  %(prog)s --coordinator "https://www.youtube.com/@example" "2024-01-01"  # 작업 큐에 등록
+  %(prog)s --worker --stages extract,combine        # 작업 큐 워커
         '''
     )
     parser.add_argument('channel_url', nargs='?', help='YouTube 채널 URL')
     parser.add_argument('cutoff_date', nargs='?', help='기한 날짜 (YYYY-MM-DD)')
     parser.add_argument('--debug', action='store_true', help='디버그 모드 활성화')
+    parser.add_argument('--refresh-stats', action='store_true',
+                        help='이미 처리한 영상들의 조회수/좋아요/댓글 수만 갱신')
+    parser.add_argument('--coordinator', action='store_true',
+                        help='발견한 영상을 처리하지 않고 공유 작업 큐에 등록')
+    parser.add_argument('--worker', action='store_true', help='공유 작업 큐의 작업을 가져와 처리하는 워커로 실행')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f'워커가 처리할 단계 (쉼표 구분, 기본값: {",".join(STAGES)})')
+    parser.add_argument('--queue', default=config.JOB_QUEUE_PATH, help='공유 작업 큐 파일 경로')
+    parser.add_argument('--exit-when-done', action='store_true', help='처리할 작업이 모두 끝나면 워커 종료')
+    parser.add_argument('--profile', nargs='?', const='profile', metavar='DIR',
+                        help='단계별 cProfile/tracemalloc 보고서를 DIR에 저장 (기본값: profile)')
+    parser.add_argument('--watch', nargs='?', const=config.WATCHLIST_FILE, metavar='WATCHLIST',
+                        help=f'감시 목록의 채널을 계속 확인하며 새 쇼츠를 처리 (기본값: {config.WATCHLIST_FILE})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='검색/다운로드 없이 API 할당량, 영상 수, 다운로드 용량, 추출 시간만 추정')
+    parser.add_argument('--resume', nargs='?', const=config.RUN_STATE_FILE, metavar='STATE',
+                        help=f'예산 소진으로 중단한 작업을 이어서 실행 (기본값: {config.RUN_STATE_FILE})')
 
     args = parser.parse_args()
 
@@ -115,9 +707,42 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("디버그 모드 활성화")
 
+    if args.refresh_stats:
+        refresh_stats(logger, args.channel_url)
+        return
+
+    profiler = StageProfiler(args.profile)
+
+    if args.watch:
+        run_watch(args.watch, logger, profiler)
+        return
+
+    if args.worker:
+        stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown or not stages:
+            print(f"❌ 알 수 없는 단계: {', '.join(unknown)} ({', '.join(STAGES)} 중 선택)")
+            sys.exit(1)
+        run_worker(args.queue, stages, args.exit_when_done, logger, profiler)
+        return
+
+    planner = QuotaPlanner()
+    budget = get_budget()
+    run_state_file = args.resume or config.RUN_STATE_FILE
+    resume_state = None
+
     try:
         # 채널 URL과 날짜 결정
-        if args.channel_url and args.cutoff_date:
+        if args.resume:
+            resume_state = load_run_state(args.resume)
+            if resume_state is None:
+                print(f"❌ 이어서 실행할 작업이 없습니다: {args.resume}")
+                return
+            channel_url, cutoff_date = resume_state['channel_url'], resume_state['cutoff_date']
+            print(f"\n▶️ 중단된 작업 이어서 실행: {channel_url} (남은 영상 {len(resume_state['pending'])}개"
+                  + (", 검색 계속" if not resume_state['discovery_done'] else "") + ")")
+            logger.info(f"이어서 실행: {args.resume}")
+        elif args.channel_url and args.cutoff_date:
             channel_url, cutoff_date = args.channel_url, args.cutoff_date
             logger.info("배치 모드로 실행")
         else:
@@ -127,122 +752,148 @@ def main():
         # 각 컴포넌트 초기화
         logger.info("컴포넌트 초기화 중...")
         youtube_api = YouTubeAPI()
-        downloader = Downloader(config.BASE_DOWNLOAD_PATH)
-        file_manager = FileManager()
-        subtitle_extractor = SubtitleExtractor()
-        image_processor = ImageProcessor()
-
-        # 1단계: YouTube API를 통한 쇼츠 영상 정보 수집
-        logger.info(f"📺 채널 분석 중: {channel_url}")
-        print(f"\n🔍 {channel_url} 채널의 쇼츠 영상을 검색 중...")
+        video_filter = VideoFilter()
+        planner.apply_channel_cache(youtube_api, channel_url)
 
-        channel_id = youtube_api.extract_channel_id(channel_url)
-        if channel_id is None:
-            print("❌ 유효한 채널 ID를 가져오지 못했습니다. URL을 다시 확인하세요.")
+        if args.dry_run:
+            plan_run(youtube_api, planner, channel_url, cutoff_date)
             return
 
-        videos_info = youtube_api.get_shorts_videos(channel_id, cutoff_date)
-
-
-        if not videos_info:
-            print("❌ 해당 기간에 쇼츠 영상을 찾을 수 없습니다.")
-            return
-
-        print(f"✅ {len(videos_info)}개의 쇼츠 영상을 발견했습니다!")
-
-        # 채널 이름 가져오기
-        channel_name = youtube_api.get_channel_name(channel_url)
-        logger.info(f"채널명: {channel_name}")
+        profiler.start()
 
-        # 2단계: 영상 다운로드
-        print(f"\n⬇️ 영상 다운로드 시작...")
-        downloaded_videos = []
-
-        for i, video_info in enumerate(videos_info, 1):
-            print(f"  📥 [{i}/{len(videos_info)}] {video_info['title'][:50]}...")
-            channel_path = os.path.join(config.BASE_DOWNLOAD_PATH, channel_name)
+        # 1단계: YouTube API를 통한 쇼츠 영상 정보 수집
+        logger.info(f"📺 채널 분석 중: {channel_url}")
+        print(f"\n🔍 {channel_url} 채널의 쇼츠 영상을 검색 중...")
 
-            try:
-                video_path = downloader.download_single_video(video_info, channel_path)
-                if video_path:
-                    downloaded_videos.append({
-                        'info': video_info,
-                        'path': video_path
+        with profiler.stage('discovery'):
+            channel_id = youtube_api.extract_channel_id(channel_url)
+            if channel_id is None:
+                print("❌ 유효한 채널 ID를 가져오지 못했습니다. URL을 다시 확인하세요.")
+                return
+
+            # 채널 이름 가져오기 (채널 ID 조회 결과가 캐시되어 있어 추가 검색 없음)
+            channel_name = youtube_api.get_channel_name(channel_url)
+            logger.info(f"채널명: {channel_name}")
+            planner.remember_channel(channel_url, channel_id=channel_id, channel_name=channel_name)
+        channel_path = os.path.join(config.BASE_DOWNLOAD_PATH, channel_name)
+
+        # 채널별 상위 N개 필터, 작업 공간 배치 처리, 코디네이터 모드, 예산 관리(중단 시 남은 목록 저장)는
+        # 전체 목록이 필요하므로 스트리밍 불가
+        use_streaming = (config.DISCOVERY_STREAMING and not args.coordinator and not resume_state
+                         and not config.WORKSPACE_ENABLED and not video_filter.top_n_per_channel
+                         and not budget.is_active())
+        discovery_done = True
+        remaining = []
+
+        if use_streaming:
+            # 2~5단계: 검색 페이지가 도착하는 대로 다운로드 → 파일 정리(+썸네일) → 자막 추출 → 이미지 합성
+            components = create_components(profiler)
+            workspace = components['workspace']
+            thumbnail_fetcher = components['thumbnail_fetcher']
+            records = youtube_api.iter_shorts_videos(channel_id, cutoff_date)
+            stats, discovered_count, accepted_count, discovery_done = process_video_stream(
+                records, video_filter, channel_path, components, logger)
+
+            if not discovered_count and discovery_done:
+                print("❌ 해당 기간에 쇼츠 영상을 찾을 수 없습니다.")
+                return
+        else:
+            # 이어서 실행: 이전에 시작하지 못한 영상 + (검색이 끊겼다면) 나머지 검색 결과
+            pending = resume_state['pending'] if resume_state else []
+            videos_info = []
+            if not resume_state or not resume_state['discovery_done']:
+                page_token = resume_state['page_token'] if resume_state else None
+                with profiler.stage('discovery'):
+                    videos_info, discovery_done = discover_videos(youtube_api, channel_id, cutoff_date, page_token)
+                if videos_info:
+                    print(f"✅ {len(videos_info)}개의 쇼츠 영상을 발견했습니다!")
+
+            if not videos_info and not pending and discovery_done:
+                print("❌ 해당 기간에 쇼츠 영상을 찾을 수 없습니다.")
+                if resume_state:
+                    os.remove(run_state_file)
+                return
+
+            # 메타데이터 필터 적용 (다운로드 전, 이전 실행에서 필터를 통과한 영상은 제외)
+            discovered_count = len(videos_info)
+            if video_filter.is_active() and videos_info:
+                videos_info = video_filter.apply(videos_info)
+                print(f"🔎 필터 적용: {len(videos_info)}/{discovered_count}개 영상만 처리합니다.")
+            videos_info = pending + videos_info
+            accepted_count = len(videos_info)
+            if not videos_info and discovery_done:
+                print("❌ 필터 조건을 만족하는 쇼츠 영상이 없습니다.")
+                if resume_state:
+                    os.remove(run_state_file)
+                return
+
+            # 코디네이터 모드: 직접 처리하지 않고 공유 작업 큐에 등록
+            if args.coordinator:
+                enqueue_videos(videos_info, channel_path, args.queue, logger)
+                if not discovery_done:
+                    save_run_state(run_state_file, {
+                        'channel_url': channel_url, 'cutoff_date': cutoff_date,
+                        'discovery_done': False, 'page_token': youtube_api.last_page_token, 'pending': [],
+                        'reason': budget.exhausted_reason, 'saved_at': datetime.now().isoformat(),
                     })
-                    logger.info(f"다운로드 완료: {video_info['title']}")
-                else:
-                    logger.warning(f"다운로드 실패: {video_info['title']}")
-
-            except Exception as e:
-                logger.error(f"다운로드 오류 - {video_info['title']}: {e}")
-
-        print(f"✅ {len(downloaded_videos)}개 영상 다운로드 완료!")
-
-        # 3단계: 파일 정리 (각 영상을 개별 폴더로 이동)
-        print(f"\n📁 파일 정리 중...")
-        organized_videos = []
-
-        for video_data in downloaded_videos:
-            try:
-                organized_path = file_manager.organize_video_file(
-                    video_data['path'], 
-                    video_data['info']['title']
-                )
-                organized_videos.append({
-                    'info': video_data['info'],
-                    'path': organized_path
-                })
-                logger.info(f"파일 정리 완료: {video_data['info']['title']}")
-
-            except Exception as e:
-                logger.error(f"파일 정리 오류 - {video_data['info']['title']}: {e}")
-
-        print(f"✅ {len(organized_videos)}개 영상 파일 정리 완료!")
-
-        # 4단계: 자막 추출
-        print(f"\n🔤 자막 추출 중...")
-        subtitle_completed = 0
-
-        for video_data in organized_videos:
-            try:
-                subtitle_extractor.extract_subtitles(video_data['path'])
-                subtitle_completed += 1
-                logger.info(f"자막 추출 완료: {video_data['info']['title']}")
-                print(f"  ✅ [{subtitle_completed}/{len(organized_videos)}] 자막 추출 완료")
-
-            except Exception as e:
-                logger.error(f"자막 추출 오류 - {video_data['info']['title']}: {e}")
-                print(f"  ❌ 자막 추출 실패: {video_data['info']['title'][:30]}...")
-
-        # 5단계: 이미지 합성
-        print(f"\n🖼️ 이미지 합성 중...")
-        image_completed = 0
-
-        for video_data in organized_videos:
-            try:
-                result_path = image_processor.combine_images(os.path.dirname(video_data['path']))
-                if result_path:
-                    image_completed += 1
-                    logger.info(f"이미지 합성 완료: {video_data['info']['title']}")
-                    print(f"  ✅ [{image_completed}/{len(organized_videos)}] 이미지 합성 완료")
-                else:
-                    print(f"  ⚠️ 합성할 이미지가 없음: {video_data['info']['title'][:30]}...")
-
-            except Exception as e:
-                logger.error(f"이미지 합성 오류 - {video_data['info']['title']}: {e}")
-                print(f"  ❌ 이미지 합성 실패: {video_data['info']['title'][:30]}...")
+                    print(f"⏸️ 검색이 끝나지 않았습니다. 나머지는 --coordinator --resume으로 등록하세요: {run_state_file}")
+                elif resume_state:
+                    os.remove(run_state_file)
+                return
+
+            # 2~5단계: 다운로드 → 파일 정리(+썸네일) → 자막 추출 → 이미지 합성
+            components = create_components(profiler)
+            workspace = components['workspace']
+            thumbnail_fetcher = components['thumbnail_fetcher']
+            stats = process_videos(videos_info, channel_path, components, logger)
+            remaining = stats['remaining']
+
+        # 다음 --dry-run 추정에 사용할 처리량 기록 (검색이 끝까지 된 경우에만 채널 업로드 속도 갱신)
+        complete_search = discovery_done and not resume_state
+        planner.record_run(channel_url, cutoff_date,
+                           youtube_api.search_result_count if complete_search else None,
+                           discovered_count, accepted_count, stats)
+
+        # 예산 소진 등으로 남은 작업은 저장해 두고 --resume으로 이어서 실행
+        stopped = not discovery_done or bool(remaining)
+        if stopped:
+            save_run_state(run_state_file, {
+                'channel_url': channel_url, 'cutoff_date': cutoff_date,
+                'discovery_done': discovery_done,
+                'page_token': None if discovery_done else youtube_api.last_page_token,
+                'pending': remaining,
+                'reason': budget.exhausted_reason or '디스크 공간 부족',
+                'saved_at': datetime.now().isoformat(),
+            })
+        elif resume_state:
+            os.remove(run_state_file)
 
         # 최종 결과 출력
         print("\n" + "="*60)
-        print("🎉 모든 작업이 완료되었습니다!")
+        if stopped:
+            print(f"⏸️ 작업을 중단했습니다: {budget.exhausted_reason or '디스크 공간 부족'}")
+        else:
+            print("🎉 모든 작업이 완료되었습니다!")
         print("="*60)
         print(f"📊 처리 결과:")
-        print(f"  • 발견된 쇼츠: {len(videos_info)}개")
-        print(f"  • 다운로드 완료: {len(downloaded_videos)}개")
-        print(f"  • 파일 정리 완료: {len(organized_videos)}개")
-        print(f"  • 자막 추출 완료: {subtitle_completed}개")
-        print(f"  • 이미지 합성 완료: {image_completed}개")
+        print(f"  • 발견된 쇼츠: {discovered_count}개")
+        print(f"  • 필터 통과: {accepted_count}개")
+        print(f"  • 다운로드 완료: {stats['downloaded']}개")
+        print(f"  • 파일 정리 완료: {stats['organized']}개")
+        if thumbnail_fetcher:
+            print(f"  • 썸네일 저장: {stats['thumbnails']}개")
+        print(f"  • 자막 추출 완료: {stats['subtitles']}개")
+        print(f"  • 이미지 합성 완료: {stats['combined']}개")
+        if workspace:
+            print(f"  • 작업 공간: {workspace.get_summary()}")
+        if budget.is_active():
+            print(f"  • 예산: {budget.get_summary()}")
+        print_retry_stats()
         print(f"\n📁 결과 저장 위치: {config.BASE_DOWNLOAD_PATH}")
+        if stopped:
+            print(f"▶️ 남은 영상 {len(remaining)}개"
+                  + (" 및 나머지 검색" if not discovery_done else "")
+                  + f"은 저장되었습니다. 이어서 실행: python main.py --resume \"{run_state_file}\"")
 
         logger.info("프로그램 실행 완료")
 
@@ -250,6 +901,10 @@ def main():
         print("\n\n⏹️ 사용자가 프로그램을 중단했습니다.")
         logger.info("사용자 중단")
 
+    except BudgetExceededError as e:
+        print(f"\n⏸️ {e}: 할당량이 초기화된 뒤 다시 실행하세요.")
+        logger.warning(f"예산 소진: {e}")
+
     except Exception as e:
         print(f"\n❌ 예상치 못한 오류가 발생했습니다: {e}")
         logger.error(f"예상치 못한 오류: {e}", exc_info=True)
@@ -259,5 +914,9 @@ def main():
             print("\n🐛 디버그 정보:")
             traceback.print_exc()
 
+    finally:
+        planner.record_usage(budget)
+        write_profile(profiler)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 cProfile / tracemalloc / 외부 프로세스 CPU 시간을 수집하는 프로파일링 모듈
+
+cProfile은 단계를 실행하는 스레드만 측정한다 (다운로드 작업자 스레드는 제외).
+실행 시간과 메모리 최대치는 모든 스레드를 포함한다.
+"""
+
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+import subprocess
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+_active_profiler = None
+
+
+def wait_with_cpu_time(proc: subprocess.Popen) -> Tuple[int, Optional[float]]:
+    """프로세스 종료를 기다리고 (종료 코드, 사용한 CPU 시간(초)) 반환. CPU 시간을 알 수 없으면 None"""
+    if os.name == 'nt':
+        returncode = proc.wait()
+        try:
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            ok = ctypes.windll.kernel32.GetProcessTimes(
+                wintypes.HANDLE(int(proc._handle)),
+                ctypes.byref(creation), ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user)
+            )
+            if not ok:
+                return returncode, None
+            to_seconds = lambda ft: ((ft.dwHighDateTime << 32) + ft.dwLowDateTime) / 1e7
+            return returncode, to_seconds(kernel) + to_seconds(user)
+        except (AttributeError, OSError, ValueError):
+            return returncode, None
+
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, rusage.ru_utime + rusage.ru_stime
+
+
+def record_subprocess(name: str, cpu_seconds: Optional[float]):
+    """실행 중인 프로파일러가 있으면 외부 프로세스 CPU 시간 기록"""
+    if _active_profiler is not None and cpu_seconds is not None:
+        _active_profiler.record_subprocess(name, cpu_seconds)
+
+
+class StageProfiler:
+    def __init__(self, profile_dir: Optional[str] = None, top_n: int = 15):
+        """프로파일러 초기화 (profile_dir가 없으면 아무것도 측정하지 않음)"""
+        self.profile_dir = profile_dir
+        self.enabled = profile_dir is not None
+        self.top_n = top_n
+
+        self.stats: Dict[str, pstats.Stats] = {}
+        self.stage_results: Dict[str, Dict] = defaultdict(lambda: {
+            'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_memory_mb': 0.0,
+            'subprocess_cpu_seconds': 0.0, 'top_allocations': [],
+        })
+        self.calls: Dict[str, List[Dict]] = defaultdict(list)
+        self._current_stage = None
+        self._stage_peak = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        global _active_profiler
+        if not self.enabled:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        tracemalloc.start(25)
+        _active_profiler = self
+        logger.info(f"프로파일링 시작: {self.profile_dir}")
+
+    def stop(self):
+        global _active_profiler
+        if not self.enabled:
+            return
+        _active_profiler = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        """단계 전체를 cProfile + tracemalloc으로 측정"""
+        if not self.enabled or self._current_stage is not None:
+            yield
+            return
+
+        self._current_stage = name
+        self._stage_peak = 0
+        profile = cProfile.Profile()
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._stage_peak)
+            snapshot_after = tracemalloc.take_snapshot()
+            self._current_stage = None
+
+            stage_stats = pstats.Stats(profile)
+            if name in self.stats:
+                self.stats[name].add(stage_stats)
+            else:
+                self.stats[name] = stage_stats
+
+            result = self.stage_results[name]
+            result['wall_seconds'] += wall
+            result['cpu_seconds'] += cpu
+            result['peak_memory_mb'] = max(result['peak_memory_mb'], peak / MB)
+            result['top_allocations'] = [
+                {'location': str(diff.traceback[0]), 'size_diff_kb': diff.size_diff / 1024, 'count_diff': diff.count_diff}
+                for diff in snapshot_after.compare_to(snapshot_before, 'lineno')[:self.top_n]
+            ]
+
+    @contextmanager
+    def call(self, stage: str, label: str):
+        """영상 한 건 처리 시간/메모리 최대치 측정 (단계 cProfile 안에서 중첩 측정)"""
+        if not self.enabled:
+            yield
+            return
+
+        # 영상별 최대치를 재기 위해 초기화하기 전에 단계 최대치에 반영
+        start_memory, peak = tracemalloc.get_traced_memory()
+        self._stage_peak = max(self._stage_peak, peak)
+        tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        entry = {'label': label, 'subprocess_cpu_seconds': 0.0}
+        with self._lock:
+            self.calls[stage].append(entry)
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            self._stage_peak = max(self._stage_peak, peak)
+            entry['wall_seconds'] = time.perf_counter() - wall_start
+            entry['cpu_seconds'] = time.process_time() - cpu_start
+            entry['peak_memory_mb'] = max(0, peak - start_memory) / MB
+
+    def record_subprocess(self, name: str, cpu_seconds: float):
+        """외부 프로세스(VideoSubFinder, ffmpeg 등) CPU 시간 기록"""
+        with self._lock:
+            stage = self._current_stage or name
+            self.stage_results[stage]['subprocess_cpu_seconds'] += cpu_seconds
+            if self.calls[stage]:
+                self.calls[stage][-1]['subprocess_cpu_seconds'] += cpu_seconds
+
+    # ----------------- 보고서 -----------------
+    def write_reports(self) -> List[str]:
+        """단계별 보고서 (.prof, .txt)와 summary.json 저장. 저장한 파일 목록 반환"""
+        if not self.enabled:
+            return []
+
+        written = []
+        for name, result in self.stage_results.items():
+            if name in self.stats:
+                prof_path = os.path.join(self.profile_dir, f'{name}.prof')
+                self.stats[name].dump_stats(prof_path)
+                written.append(prof_path)
+
+            txt_path = os.path.join(self.profile_dir, f'{name}.txt')
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(f"[{name}] 실행 {result['wall_seconds']:.2f}s, CPU {result['cpu_seconds']:.2f}s, "
+                        f"외부 프로세스 CPU {result['subprocess_cpu_seconds']:.2f}s, "
+                        f"메모리 최대 {result['peak_memory_mb']:.1f}MB\n\n")
+                if name in self.stats:
+                    stream = io.StringIO()
+                    self.stats[name].stream = stream
+                    self.stats[name].sort_stats('cumulative').print_stats(self.top_n * 2)
+                    f.write(stream.getvalue())
+                f.write("\n== 메모리 증가 상위 위치 ==\n")
+                for alloc in result['top_allocations']:
+                    f.write(f"{alloc['size_diff_kb']:+10.1f} KB  {alloc['count_diff']:+7d}  {alloc['location']}\n")
+                f.write("\n== 영상별 측정 ==\n")
+                for entry in sorted(self.calls.get(name, []), key=lambda e: e.get('wall_seconds', 0), reverse=True):
+                    f.write(f"{entry.get('wall_seconds', 0):8.2f}s  CPU {entry.get('cpu_seconds', 0):7.2f}s  "
+                            f"외부 {entry['subprocess_cpu_seconds']:7.2f}s  "
+                            f"메모리 {entry.get('peak_memory_mb', 0):7.1f}MB  {entry['label']}\n")
+            written.append(txt_path)
+
+        summary_path = os.path.join(self.profile_dir, 'summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.stage_results, 'calls': self.calls}, f, ensure_ascii=False, indent=2)
+        written.append(summary_path)
+
+        logger.info(f"프로파일 보고서 저장: {self.profile_dir}")
+        return written
+
+    def get_hotspots(self, top_n: int = 10) -> List[Tuple[str, str, float, int]]:
+        """모든 단계에서 자체 실행 시간(tottime)이 가장 긴 함수 목록 (단계, 함수, 초, 호출 수)"""
+        hotspots = []
+        for name, stage_stats in self.stats.items():
+            for (filename, lineno, func), (_, ncalls, tottime, _, _) in stage_stats.stats.items():
+                location = f"{os.path.basename(filename)}:{lineno}({func})"
+                hotspots.append((name, location, tottime, ncalls))
+        return sorted(hotspots, key=lambda h: h[2], reverse=True)[:top_n]
+
+    def print_summary(self, top_n: int = 10):
+        """단계별 요약과 상위 병목 함수 출력"""
+        if not self.enabled:
+            return
+
+        print(f"\n⏱️ 프로파일 요약 ({self.profile_dir})")
+        for name, result in self.stage_results.items():
+            print(f"  • {name}: 실행 {result['wall_seconds']:.1f}s, CPU {result['cpu_seconds']:.1f}s, "
+                  f"외부 프로세스 CPU {result['subprocess_cpu_seconds']:.1f}s, "
+                  f"메모리 최대 {result['peak_memory_mb']:.1f}MB")
+
+        hotspots = self.get_hotspots(top_n)
+        if hotspots:
+            print(f"🔥 상위 {len(hotspots)}개 병목 함수 (자체 실행 시간):")
+            for stage, location, tottime, ncalls in hotspots:
+                print(f"  {tottime:8.2f}s  {ncalls:>8}회  [{stage}] {location}")
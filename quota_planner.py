@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+YouTube API 할당량/다운로드 용량 예산 관리 및 실행 비용 추정(--dry-run) 모듈
+
+- QuotaBudget : 실행 중 API units / 다운로드 바이트를 집계하고 예산을 넘으면 중단시킴
+- QuotaPlanner : 일별 할당량 사용량, 채널 통계 캐시, 과거 처리량을 저장하고 실행 비용을 추정
+"""
+
+import os
+import json
+import math
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+# YouTube Data API v3 메서드별 할당량 비용 (units)
+API_UNIT_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+}
+
+# 별도 신청 없이 프로젝트에 주어지는 일일 할당량
+DEFAULT_DAILY_QUOTA = 10000
+
+# 할당량은 태평양 시간 자정에 초기화됨 (서머타임은 무시)
+QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# 캐시된 채널 통계를 다시 조회하기까지의 기간
+CHANNEL_STATS_MAX_AGE = timedelta(days=7)
+
+
+class BudgetExceededError(Exception):
+    """할당량 또는 다운로드 용량 예산을 모두 사용함"""
+
+
+def get_quota_day() -> str:
+    """할당량 집계 기준 날짜 (YYYY-MM-DD)"""
+    return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+
+def get_api_cost(method_id: str) -> int:
+    """googleapiclient 요청의 methodId (예: youtube.search.list)에 해당하는 units"""
+    return API_UNIT_COSTS.get(method_id.split('.', 1)[-1], 1)
+
+
+class QuotaBudget:
+    def __init__(self,
+                 quota_units: int = config.QUOTA_BUDGET_UNITS,
+                 bandwidth_mb: float = config.BANDWIDTH_BUDGET_MB,
+                 used_units: int = 0):
+        """예산 초기화
+
+        quota_units : 하루 동안 사용할 API units (0이면 제한 없음)
+        bandwidth_mb : 이번 실행에서 다운로드할 최대 용량 (0이면 제한 없음)
+        used_units : 오늘 이미 사용한 units (이전 실행 포함)
+        """
+        self.quota_units = max(0, quota_units)
+        self.bandwidth_bytes = max(0.0, bandwidth_mb) * MB
+        self._lock = threading.Lock()
+        self.day = get_quota_day()
+        self.used_units = used_units
+        self.unsaved_units = 0
+        self.bytes_used = 0
+        self.bytes_day = self.day
+        self.exhausted_reason: Optional[str] = None
+
+    def is_active(self) -> bool:
+        return bool(self.quota_units or self.bandwidth_bytes)
+
+    def charge_api(self, method_id: str) -> int:
+        """API 요청 전에 호출. 예산을 넘게 되면 요청하지 않고 BudgetExceededError 발생"""
+        cost = get_api_cost(method_id)
+        with self._lock:
+            day = get_quota_day()
+            if day != self.day:
+                self.day, self.used_units = day, 0
+
+            if self.quota_units and self.used_units + cost > self.quota_units:
+                self.exhausted_reason = f"API 할당량 예산 소진 ({self.used_units}/{self.quota_units} units)"
+                raise BudgetExceededError(self.exhausted_reason)
+
+            self.used_units += cost
+            self.unsaved_units += cost
+        return cost
+
+    def mark_exhausted(self, reason: str) -> str:
+        """예산 밖의 이유(YouTube 일일 할당량 소진 등)로 더 진행할 수 없음을 기록"""
+        with self._lock:
+            self.exhausted_reason = reason
+        return reason
+
+    def charge_bytes(self, amount: int):
+        """다운로드한 바이트 집계 (진행 중인 다운로드는 끝까지 받음)"""
+        with self._lock:
+            self.bytes_used += amount
+
+    def reset_bandwidth_if_new_day(self) -> bool:
+        """할당량 기준 날짜가 바뀌었으면 다운로드 용량 집계를 초기화 (감시 모드처럼 계속 실행할 때 사용)"""
+        with self._lock:
+            day = get_quota_day()
+            if day == self.bytes_day:
+                return False
+            self.bytes_day, self.bytes_used = day, 0
+            self.exhausted_reason = None
+            return True
+
+    def allows_download(self) -> bool:
+        """새 다운로드를 시작해도 되는지 (다운로드 용량 예산 기준)"""
+        with self._lock:
+            if self.bandwidth_bytes and self.bytes_used >= self.bandwidth_bytes:
+                self.exhausted_reason = (f"다운로드 용량 예산 소진 "
+                                         f"({self.bytes_used / MB:.0f}/{self.bandwidth_bytes / MB:.0f}MB)")
+                return False
+            return True
+
+    def pop_unsaved_units(self):
+        """(날짜, 아직 기록 파일에 반영하지 않은 units) 반환 후 초기화"""
+        with self._lock:
+            units, self.unsaved_units = self.unsaved_units, 0
+            return self.day, units
+
+    def get_summary(self) -> str:
+        quota = f"{self.used_units}/{self.quota_units}" if self.quota_units else f"{self.used_units}"
+        summary = f"오늘 API {quota} units, 다운로드 {self.bytes_used / MB:.0f}MB"
+        if self.bandwidth_bytes:
+            summary += f"/{self.bandwidth_bytes / MB:.0f}MB"
+        return summary
+
+
+class QuotaPlanner:
+    def __init__(self, state_file: str = config.PLANNER_STATE_FILE):
+        """비용 추정기 초기화
+
+        상태 파일 형식:
+            quota_usage : {날짜: 사용 units}
+            channels : {채널 URL: {channel_id, channel_name, video_count, published_at, stats_fetched_at,
+                                   results_per_day, shorts_ratio}}
+            throughput : 누적 처리량 (search_results, search_shorts, discovered, accepted,
+                         downloaded, bytes, extracted, extract_seconds)
+        """
+        self.state_file = state_file
+        self.state = self._load_state()
+        # 저장 시 파일을 다시 읽어 합칠 이번 인스턴스의 변경분
+        self._usage_delta: Dict[str, int] = {}
+        self._channel_updates: Dict[str, Dict] = {}
+        self._throughput_delta: Dict[str, float] = {}
+
+    # ----------------- 상태 파일 -----------------
+    def _load_state(self) -> Dict:
+        state = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"비용 추정 기록 파일을 읽을 수 없어 새로 시작합니다: {e}")
+        state.setdefault('quota_usage', {})
+        state.setdefault('channels', {})
+        state.setdefault('throughput', {})
+        return state
+
+    def save_state(self):
+        """상태 파일 저장
+
+        다른 프로세스(감시 모드, 통계 갱신 등)가 그 사이 기록했을 수 있으므로 파일을 다시 읽고
+        이 인스턴스의 변경분(사용 units, 채널 정보, 처리량 증가분)만 더해서 쓴다.
+        """
+        state = self._load_state()
+
+        usage = state['quota_usage']
+        for day, units in self._usage_delta.items():
+            usage[day] = usage.get(day, 0) + units
+        # 최근 30일치만 보관
+        for old_day in sorted(usage)[:-30]:
+            del usage[old_day]
+
+        for channel_url, fields in self._channel_updates.items():
+            state['channels'].setdefault(channel_url, {}).update(fields)
+
+        throughput = state['throughput']
+        for key, value in self._throughput_delta.items():
+            throughput[key] = throughput.get(key, 0) + value
+
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+        self.state = state
+        self._usage_delta, self._channel_updates, self._throughput_delta = {}, {}, {}
+
+    # ----------------- 할당량 사용량 -----------------
+    def get_used_units(self, day: Optional[str] = None) -> int:
+        return self.state['quota_usage'].get(day or get_quota_day(), 0)
+
+    def record_usage(self, budget: QuotaBudget):
+        """budget에서 아직 기록하지 않은 units를 일별 사용량에 더하고 상태 파일 저장"""
+        day, units = budget.pop_unsaved_units()
+        if units:
+            self._usage_delta[day] = self._usage_delta.get(day, 0) + units
+        self.save_state()
+
+    # ----------------- 채널 캐시 -----------------
+    def get_channel(self, channel_url: str) -> Dict:
+        return self.state['channels'].get(channel_url, {})
+
+    def remember_channel(self, channel_url: str, **fields):
+        self.state['channels'].setdefault(channel_url, {}).update(fields)
+        self._channel_updates.setdefault(channel_url, {}).update(fields)
+
+    def apply_channel_cache(self, youtube_api, channel_url: str):
+        """저장된 채널 ID/이름을 API 클라이언트 캐시에 넣어 채널 검색(100 units)을 생략"""
+        entry = self.get_channel(channel_url)
+        if entry.get('channel_id'):
+            youtube_api.remember_channel(channel_url, entry['channel_id'], entry.get('channel_name'))
+
+    def get_channel_statistics(self, youtube_api, channel_url: str, channel_id: str) -> Dict:
+        """채널 통계 (CHANNEL_STATS_MAX_AGE 이내에 조회한 값은 캐시 사용)"""
+        entry = self.get_channel(channel_url)
+        fetched_at = entry.get('stats_fetched_at')
+        if fetched_at and datetime.now(timezone.utc) - datetime.fromisoformat(fetched_at) < CHANNEL_STATS_MAX_AGE:
+            return entry
+
+        statistics = youtube_api.get_channel_statistics(channel_id)
+        if statistics:
+            self.remember_channel(channel_url, stats_fetched_at=datetime.now(timezone.utc).isoformat(), **statistics)
+        return self.get_channel(channel_url)
+
+    # ----------------- 처리량 기록 -----------------
+    def _add_throughput(self, key: str, value: float):
+        throughput = self.state['throughput']
+        throughput[key] = throughput.get(key, 0) + value
+        self._throughput_delta[key] = self._throughput_delta.get(key, 0) + value
+
+    def record_run(self, channel_url: str, cutoff_date: str, search_results: Optional[int],
+                   discovered: int, accepted: int, stats: Dict):
+        """실행 결과를 기록하여 다음 추정에 사용
+
+        search_results : 검색 결과 수 (검색이 중간에 끊겼거나 이어서 실행한 경우 None → 채널 비율은 갱신 안 함)
+        """
+        if search_results:
+            days = max(1, (datetime.now() - datetime.strptime(cutoff_date, '%Y-%m-%d')).days + 1)
+            self.remember_channel(channel_url,
+                                  results_per_day=search_results / days,
+                                  shorts_ratio=discovered / search_results)
+            self._add_throughput('search_results', search_results)
+            self._add_throughput('search_shorts', discovered)
+
+        for key, value in (('discovered', discovered), ('accepted', accepted),
+                           ('downloaded', stats.get('downloaded', 0)), ('bytes', stats.get('bytes', 0)),
+                           ('extracted', stats.get('organized', 0)),
+                           ('extract_seconds', stats.get('extract_seconds', 0.0))):
+            self._add_throughput(key, value)
+
+    def _ratio(self, numerator: str, denominator: str) -> Optional[float]:
+        throughput = self.state['throughput']
+        if throughput.get(denominator):
+            return throughput.get(numerator, 0) / throughput[denominator]
+        return None
+
+    # ----------------- 추정 -----------------
+    def estimate(self, channel_url: str, cutoff_date: str, budget: QuotaBudget) -> Dict:
+        """캐시된 채널 통계와 과거 처리량으로 실행 비용 추정 (채널 통계는 get_channel_statistics로 먼저 준비)"""
+        entry = self.get_channel(channel_url)
+        now = datetime.now(timezone.utc)
+        days = max(1, (now.date() - datetime.strptime(cutoff_date, '%Y-%m-%d').date()).days + 1)
+
+        video_count = entry.get('video_count') or 0
+        age_days = days
+        if entry.get('published_at'):
+            published_at = datetime.fromisoformat(entry['published_at'].replace('Z', '+00:00'))
+            age_days = max(1, (now - published_at).days)
+
+        # 기간 내 검색 결과 수: 이 채널의 과거 기록 → 채널 전체 영상 수의 평균 업로드 속도
+        if entry.get('results_per_day') is not None:
+            results_source = '과거 기록'
+            expected_results = entry['results_per_day'] * min(days, age_days)
+        else:
+            results_source = '채널 통계'
+            expected_results = video_count / age_days * min(days, age_days)
+        if video_count:
+            expected_results = min(video_count, expected_results)
+        expected_results = math.ceil(expected_results)
+
+        shorts_ratio = entry.get('shorts_ratio')
+        if shorts_ratio is None:
+            shorts_ratio = self._ratio('search_shorts', 'search_results') or 1.0
+        accept_ratio = self._ratio('accepted', 'discovered') or 1.0
+        expected_shorts = math.ceil(expected_results * shorts_ratio)
+        expected_videos = math.ceil(expected_shorts * accept_ratio)
+
+        # 검색 한 페이지마다 search.list 1회 + videos.list 1회
+        pages = max(1, math.ceil(expected_results / config.MAX_RESULTS_PER_REQUEST))
+        units = {
+            'search.list': pages * API_UNIT_COSTS['search.list'],
+            'videos.list': pages * API_UNIT_COSTS['videos.list'],
+        }
+        total_units = sum(units.values())
+        # 참고: 업로드 재생목록(playlistItems.list)으로 검색했을 때의 비용
+        playlist_units = pages * (API_UNIT_COSTS['playlistItems.list'] + API_UNIT_COSTS['videos.list'])
+
+        avg_bytes = self._ratio('bytes', 'downloaded')
+        bytes_source = '과거 기록' if avg_bytes else '기본값'
+        avg_bytes = avg_bytes or config.PLAN_DEFAULT_VIDEO_MB * MB
+        avg_extract = self._ratio('extract_seconds', 'extracted')
+        extract_source = '과거 기록' if avg_extract else '기본값'
+        avg_extract = avg_extract or config.PLAN_DEFAULT_EXTRACT_SECONDS
+
+        download_bytes = expected_videos * avg_bytes
+        download_seconds = None
+        if config.DOWNLOAD_BANDWIDTH_LIMIT_MB > 0:
+            download_seconds = download_bytes / (config.DOWNLOAD_BANDWIDTH_LIMIT_MB * MB)
+
+        daily_limit = budget.quota_units or DEFAULT_DAILY_QUOTA
+        remaining_units = max(0, daily_limit - budget.used_units)
+
+        return {
+            'days': days,
+            'expected_results': expected_results,
+            'results_source': results_source,
+            'expected_shorts': expected_shorts,
+            'expected_videos': expected_videos,
+            'pages': pages,
+            'units': units,
+            'total_units': total_units,
+            'playlist_units': playlist_units,
+            'download_bytes': download_bytes,
+            'bytes_source': bytes_source,
+            'download_seconds': download_seconds,
+            'extract_seconds': expected_videos * avg_extract,
+            'extract_source': extract_source,
+            'daily_limit': daily_limit,
+            'remaining_units': remaining_units,
+            'fits_quota': total_units <= remaining_units,
+            'fits_bandwidth': not budget.bandwidth_bytes or download_bytes <= budget.bandwidth_bytes,
+        }
+
+    def format_plan(self, plan: Dict) -> str:
+        """추정 결과를 출력용 문자열로 변환"""
+        lines = [
+            f"📅 검색 기간: {plan['days']}일",
+            f"🎞️ 예상 검색 결과 {plan['expected_results']}개 ({plan['results_source']}) → "
+            f"쇼츠 {plan['expected_shorts']}개 → 처리 대상 {plan['expected_videos']}개",
+            f"🔑 예상 API 사용량: {plan['total_units']} units (검색 {plan['pages']}페이지)",
+        ]
+        for method, units in plan['units'].items():
+            lines.append(f"  • {method}: {units} units")
+        lines.append(f"  • (참고) 업로드 재생목록 방식이었다면: {plan['playlist_units']} units")
+        lines.append(f"  • 오늘 남은 할당량: {plan['remaining_units']}/{plan['daily_limit']} units")
+
+        lines.append(f"⬇️ 예상 다운로드 용량: {plan['download_bytes'] / MB:.0f}MB ({plan['bytes_source']})")
+        if plan['download_seconds'] is not None:
+            lines.append(f"  • 대역폭 상한 기준 다운로드 시간: {plan['download_seconds'] / 60:.0f}분")
+        lines.append(f"🔤 예상 자막 추출 시간: {plan['extract_seconds'] / 60:.0f}분 ({plan['extract_source']})")
+
+        if not plan['fits_quota']:
+            lines.append("⚠️ 예상 API 사용량이 오늘 남은 할당량을 넘습니다. 예산에 도달하면 중단 후 --resume으로 이어서 실행하세요.")
+        if not plan['fits_bandwidth']:
+            lines.append("⚠️ 예상 다운로드 용량이 다운로드 용량 예산을 넘습니다.")
+        return '\n'.join(lines)
+
+
+_budget: Optional[QuotaBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_budget() -> QuotaBudget:
+    """프로세스 전체가 공유하는 예산 (오늘 이미 사용한 units는 기록 파일에서 읽음)"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = QuotaBudget(used_units=QuotaPlanner().get_used_units())
+        return _budget
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+여러 스레드가 함께 사용하는 토큰 버킷 속도 제한 모듈
+"""
+
+import time
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        rate : 초당 보충되는 토큰 수 (0 이하이면 제한 없음)
+        capacity : 버킷 최대 크기 (기본값: 1초 분량)
+        """
+        self._lock = threading.Lock()
+        self._rate = 0.0
+        self._capacity = 0.0
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate, capacity)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def set_rate(self, rate: float, capacity: float = None):
+        """실행 중에 제한 속도 변경"""
+        with self._lock:
+            self._refill()
+            self._rate = max(0.0, float(rate or 0))
+            self._capacity = float(capacity) if capacity else self._rate
+            self._tokens = min(self._tokens, self._capacity)
+        logger.debug(f"속도 제한 변경: {self._rate:g}/s" if self._rate else "속도 제한 해제")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def consume(self, amount: float = 1.0):
+        """토큰을 사용. 부족하면 보충될 때까지 대기 (버킷보다 큰 요청은 빚으로 처리)"""
+        while True:
+            with self._lock:
+                if self._rate <= 0:
+                    return
+                self._refill()
+                if self._tokens > 0:
+                    self._tokens -= amount
+                    return
+                wait = -self._tokens / self._rate + 0.01
+            time.sleep(min(wait, 1.0))
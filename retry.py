@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+API 호출, 다운로드, 자막 추출에 공통으로 적용하는 재시도/백오프/서킷 브레이커 모듈
+"""
+
+import re
+import json
+import time
+import random
+import socket
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 오류 종류별 재시도 규칙 (base_delay는 RETRY_BASE_DELAY에 곱하는 배수)
+RETRY_RULES = {
+    'quota': {'retry': False, 'trip': True},        # 일일 할당량 소진: 재시도 무의미, 즉시 차단
+    'forbidden': {'retry': False, 'trip': False},   # 403 (권한/비공개 영상 등)
+    'rate_limit': {'retry': True, 'trip': True, 'base_delay': 5.0},  # 429, 403 rateLimitExceeded
+    'server': {'retry': True, 'trip': True, 'base_delay': 1.0},      # 5xx
+    'network': {'retry': True, 'trip': True, 'base_delay': 2.0},     # 연결/시간 초과
+    'transient': {'retry': True, 'trip': True, 'base_delay': 1.0},   # 외부 프로그램 비정상 종료 등
+    'fatal': {'retry': False, 'trip': False},
+}
+
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+_NETWORK_PATTERNS = re.compile(
+    r'timed? ?out|connection (reset|refused|aborted)|temporary failure|name resolution|'
+    r'remote end closed|incompleteread|network is unreachable|broken pipe',
+    re.IGNORECASE
+)
+_HTTP_STATUS_PATTERN = re.compile(r'HTTP Error (\d{3})')
+
+
+class TransientError(Exception):
+    """재시도하면 성공할 수 있는 오류 (외부 프로그램 비정상 종료 등)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 호출을 거부함"""
+
+    def __init__(self, message: str, error_class: Optional[str] = None):
+        super().__init__(message)
+        self.error_class = error_class  # 차단 원인 (할당량 소진이면 'quota')
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_error_reason(exc) -> str:
+    """googleapiclient HttpError 본문에서 오류 사유(reason) 추출"""
+    try:
+        content = exc.content.decode('utf-8') if isinstance(exc.content, bytes) else exc.content
+        errors = json.loads(content).get('error', {}).get('errors', [])
+        if errors:
+            return errors[0].get('reason', '')
+    except (AttributeError, ValueError, TypeError):
+        pass
+    return ''
+
+
+def classify_error(exc: BaseException) -> Tuple[str, Optional[float]]:
+    """예외를 (오류 종류, Retry-After 초) 로 분류"""
+    if isinstance(exc, TransientError):
+        return 'transient', exc.retry_after
+
+    # googleapiclient.errors.HttpError / requests.HTTPError (의존성 없이 속성으로 판별)
+    status, retry_after = None, None
+    resp = getattr(exc, 'resp', None)
+    response = getattr(exc, 'response', None)
+    if getattr(resp, 'status', None) is not None:
+        status = int(resp.status)
+        retry_after = _parse_retry_after(resp.get('retry-after')) if hasattr(resp, 'get') else None
+    elif getattr(response, 'status_code', None) is not None:
+        status = int(response.status_code)
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+
+    if status is not None:
+        reason = _http_error_reason(exc)
+        if reason in QUOTA_REASONS:
+            return 'quota', None
+        if status == 429 or reason in RATE_LIMIT_REASONS:
+            return 'rate_limit', retry_after
+        if status == 403:
+            return 'forbidden', None
+        if status >= 500:
+            return 'server', retry_after
+        return 'fatal', None
+
+    if isinstance(exc, (ConnectionError, TimeoutError, socket.timeout, socket.gaierror)):
+        return 'network', None
+
+    # yt-dlp DownloadError 등 메시지로만 구분 가능한 오류
+    message = str(exc)
+    match = _HTTP_STATUS_PATTERN.search(message)
+    if match:
+        code = int(match.group(1))
+        if code == 429:
+            return 'rate_limit', None
+        if code == 403:
+            return 'forbidden', None
+        if code >= 500:
+            return 'server', None
+    if _NETWORK_PATTERNS.search(message):
+        return 'network', None
+
+    return 'fatal', None
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    """일일 할당량 소진 오류(또는 그로 인해 차단된 서킷)인지"""
+    if isinstance(exc, CircuitOpenError):
+        return exc.error_class == 'quota'
+    return classify_error(exc)[0] == 'quota'
+
+
+class CircuitBreaker:
+    def __init__(self, name: str,
+                 failure_threshold: int = config.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = config.CIRCUIT_RESET_TIMEOUT):
+        """서킷 브레이커 초기화"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_until = 0.0
+        self._blocked_reason = None  # 할당량 소진 등 기다려도 풀리지 않는 차단
+        self.open_count = 0
+
+    def before_call(self):
+        """호출 전 확인. 서킷이 열려 있으면 재시도 시간까지 대기(일시 중지)"""
+        with self._lock:
+            if self._blocked_reason:
+                raise CircuitOpenError(f"{self.name} 차단됨: {self._blocked_reason}", 'quota')
+            wait = self._opened_until - time.monotonic()
+
+        if wait > 0:
+            logger.warning(f"[{self.name}] 서킷 열림, {wait:.0f}초 대기 후 재개")
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self, error_class: str):
+        with self._lock:
+            if error_class == 'quota':
+                self._blocked_reason = 'API 할당량 소진'
+                self.open_count += 1
+                logger.error(f"[{self.name}] API 할당량 소진으로 이후 호출을 차단합니다.")
+                return
+
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_until = time.monotonic() + self.reset_timeout
+                self._failures = 0
+                self.open_count += 1
+                logger.warning(f"[{self.name}] 연속 {self.failure_threshold}회 실패, {self.reset_timeout:.0f}초 동안 일시 중지")
+
+
+class RetryPolicy:
+    def __init__(self, stage: str,
+                 max_attempts: int = config.MAX_RETRY_ATTEMPTS,
+                 base_delay: float = config.RETRY_BASE_DELAY,
+                 max_delay: float = config.RETRY_MAX_DELAY,
+                 breaker: Optional[CircuitBreaker] = None):
+        """단계별 재시도 정책 초기화"""
+        self.stage = stage
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(stage)
+
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get_delay(self, attempt: int, error_class: str, retry_after: Optional[float] = None) -> float:
+        """지터가 적용된 지수 백오프 대기 시간 (Retry-After가 있으면 그 이상 대기)"""
+        base = self.base_delay * RETRY_RULES[error_class].get('base_delay', 1.0)
+        delay = random.uniform(0, min(self.max_delay, base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, func: Callable, *args, **kwargs):
+        """func을 재시도 정책에 따라 실행. 최종 실패 시 마지막 예외를 그대로 발생"""
+        self._count('calls')
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                error_class, retry_after = classify_error(e)
+                rule = RETRY_RULES[error_class]
+                self._count(f'error:{error_class}')
+                if rule['trip']:
+                    self.breaker.record_failure(error_class)
+
+                attempt += 1
+                if not rule['retry'] or attempt >= self.max_attempts:
+                    self._count('failures')
+                    raise
+
+                delay = self.get_delay(attempt - 1, error_class, retry_after)
+                self._count('retries')
+                logger.warning(f"[{self.stage}] {error_class} 오류로 {delay:.1f}초 후 재시도 ({attempt}/{self.max_attempts - 1}): {e}")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+
+_policies: Dict[str, RetryPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(stage: str) -> RetryPolicy:
+    """단계별 공유 재시도 정책 (youtube_api / download / extract)"""
+    with _policies_lock:
+        if stage not in _policies:
+            _policies[stage] = RetryPolicy(stage)
+        return _policies[stage]
+
+
+def get_retry_stats() -> Dict[str, Dict[str, int]]:
+    """단계별 호출/재시도/실패 횟수"""
+    with _policies_lock:
+        return {stage: dict(policy.stats) for stage, policy in _policies.items()}
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+이미 처리한 영상들의 통계(조회수/좋아요/댓글)를 일괄 갱신하고 시계열로 기록하는 모듈
+"""
+
+import os
+import csv
+import logging
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+import config
+from youtube_api import YouTubeAPI
+from file_manager import FileManager
+from downloader import VideoDownloader
+from rate_limiter import TokenBucket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HISTORY_FIELDS = ['fetched_at', 'video_id', 'view_count', 'like_count', 'comment_count']
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm')
+
+# 메타데이터를 채울 때 조회할 업로드 재생목록 범위 (YouTube 서비스 시작일, 즉 전체)
+BACKFILL_SINCE_DATE = '2005-01-01'
+
+
+def _name_key(name: str) -> str:
+    """파일 정리 단계의 폴더명 규칙(끝의 마침표/공백 제거)과 같게 맞춘 비교용 이름"""
+    return name.rstrip('. ').rstrip('\u3002')
+
+
+class StatsRefresher:
+    def __init__(self,
+                 file_manager: FileManager = None,
+                 max_workers: int = config.STATS_REFRESH_WORKERS,
+                 rate: float = config.STATS_REFRESH_RATE,
+                 history_file: str = config.STATS_HISTORY_FILE):
+        """통계 갱신기 초기화"""
+        self.file_manager = file_manager or FileManager()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(rate, capacity=self.max_workers)
+        self.history_file = history_file
+
+        # googleapiclient 서비스 객체는 스레드 간 공유가 안전하지 않으므로 스레드마다 생성
+        self._local = threading.local()
+
+    def _get_api(self) -> YouTubeAPI:
+        if not hasattr(self._local, 'api'):
+            self._local.api = YouTubeAPI()
+        return self._local.api
+
+    def _fetch_batch(self, video_ids: List[str]) -> Dict[str, Dict]:
+        self.rate_limiter.consume(1)
+        return self._get_api().get_video_statistics(video_ids)
+
+    def fetch_statistics(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """영상 ID들을 50개씩 나눠 병렬로 통계 조회"""
+        batch_size = config.MAX_RESULTS_PER_REQUEST
+        batches = [video_ids[i:i + batch_size] for i in range(0, len(video_ids), batch_size)]
+        logger.info(f"통계 갱신: 영상 {len(video_ids)}개, API 호출 {len(batches)}회")
+
+        statistics = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_batch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    statistics.update(future.result())
+                except Exception as e:
+                    logger.error(f"통계 조회 실패 ({len(futures[future])}개 영상): {e}")
+
+        return statistics
+
+    def append_history(self, statistics: Dict[str, Dict], fetched_at: str):
+        """조회한 통계를 시계열 CSV 파일에 추가"""
+        history_dir = os.path.dirname(self.history_file)
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+
+        write_header = not os.path.exists(self.history_file)
+        with open(self.history_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS)
+            if write_header:
+                writer.writeheader()
+            for video_id, stats in statistics.items():
+                writer.writerow({'fetched_at': fetched_at, 'video_id': video_id, **stats})
+
+    def backfill_metadata(self, channel_url: str) -> Dict[str, int]:
+        """메타데이터 저장 기능 이전에 처리되어 video_info.json이 없는 채널 영상 폴더에 메타데이터 채우기
+
+        채널 업로드 재생목록(50개당 2 units)의 쇼츠 제목을 다운로드 파일명 규칙으로 바꿔
+        폴더 안 영상 파일명(영상이 정리되어 없으면 폴더명)과 비교한다.
+        반환값 : {'folders': 메타데이터가 없던 폴더 수, 'filled': 채운 폴더 수}
+        """
+        api = self._get_api()
+        channel_id = api.extract_channel_id(channel_url)
+        if channel_id is None:
+            logger.error(f"채널 ID를 가져오지 못했습니다: {channel_url}")
+            return {'folders': 0, 'filled': 0}
+
+        channel_path = os.path.join(config.BASE_DOWNLOAD_PATH, api.get_channel_name(channel_url))
+        if not os.path.isdir(channel_path):
+            logger.warning(f"채널 폴더가 없습니다: {channel_path}")
+            return {'folders': 0, 'filled': 0}
+
+        folders = [
+            os.path.join(channel_path, name) for name in sorted(os.listdir(channel_path))
+            if os.path.isdir(os.path.join(channel_path, name))
+            and not os.path.exists(os.path.join(channel_path, name, config.VIDEO_INFO_FILENAME))
+        ]
+        if not folders:
+            return {'folders': 0, 'filled': 0}
+
+        videos_by_name = {}
+        for video in api.get_recent_shorts(channel_id, BACKFILL_SINCE_DATE):
+            videos_by_name.setdefault(_name_key(VideoDownloader.sanitize_filename(video['title'])), video)
+
+        filled = 0
+        for folder in folders:
+            video = self._match_folder(folder, videos_by_name)
+            if video is None:
+                logger.warning(f"일치하는 영상을 찾지 못했습니다: {folder}")
+                continue
+            try:
+                self.file_manager.save_video_metadata(folder, video)
+                filled += 1
+            except OSError as e:
+                logger.warning(f"메타데이터 저장 실패: {folder}, 오류: {e}")
+
+        logger.info(f"메타데이터 채움: {filled}/{len(folders)}개 ({channel_path})")
+        return {'folders': len(folders), 'filled': filled}
+
+    @staticmethod
+    def _match_folder(folder: str, videos_by_name: Dict[str, Dict]):
+        """영상 폴더에 해당하는 영상 정보 (없거나 여러 개와 일치하면 None)"""
+        names = [os.path.splitext(f)[0] for f in os.listdir(folder) if f.lower().endswith(VIDEO_EXTENSIONS)]
+        names.append(os.path.basename(folder))
+
+        for name in names:
+            video = videos_by_name.get(_name_key(name))
+            if video:
+                return video
+
+        # 경로 길이 제한으로 폴더명이 잘린 경우("...")는 앞부분으로 비교
+        prefix = _name_key(os.path.basename(folder))
+        if os.path.basename(folder).endswith('...') and prefix:
+            matches = [video for key, video in videos_by_name.items() if key.startswith(prefix)]
+            if len(matches) == 1:
+                return matches[0]
+        return None
+
+    def refresh(self, base_path: str = config.BASE_DOWNLOAD_PATH) -> Dict[str, int]:
+        """base_path 아래 처리된 모든 영상의 통계 갱신. 결과 요약 반환"""
+        processed = self.file_manager.find_processed_videos(base_path)
+        video_ids = list(dict.fromkeys(item['info']['video_id'] for item in processed))
+        if not video_ids:
+            return {'videos': 0, 'updated': 0}
+
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        statistics = self.fetch_statistics(video_ids)
+        self.append_history(statistics, fetched_at)
+
+        # 각 영상 폴더의 메타데이터도 최신 값으로 갱신
+        for item in processed:
+            stats = statistics.get(item['info']['video_id'])
+            if not stats:
+                continue
+            info = dict(item['info'], **stats)
+            info['stats_updated_at'] = fetched_at
+            try:
+                self.file_manager.save_video_metadata(item['folder'], info)
+            except OSError as e:
+                logger.warning(f"메타데이터 갱신 실패: {item['folder']}, 오류: {e}")
+
+        logger.info(f"통계 갱신 완료: {len(statistics)}/{len(video_ids)}개")
+        return {'videos': len(video_ids), 'updated': len(statistics)}
@@ -4,19 +4,41 @@ VideoSubFinderWXW.exe를 사용하여 자막을 추출하는 모듈
 """
 
 import os
+import json
 import subprocess
 import logging
-from typing import List, Dict, Optional
-from config import VIDEOSUBFINDER_PATH, VIDEOSUBFINDER_OPTIONS, VIDEOSUBFINDER_THRESHOLD
+from typing import List, Dict, Optional, Tuple
+from config import VIDEOSUBFINDER_PATH, VIDEOSUBFINDER_THRESHOLD, PACK_TXT_IMAGES
+from retry import get_policy, TransientError
+from profiler import wait_with_cpu_time, record_subprocess
+from frame_pack import pack_txt_images, parse_timestamps, IMAGE_EXTENSIONS
+from config import (
+    SUBTITLE_PROXY_ENABLED, FFMPEG_PATH, FFPROBE_PATH,
+    SUBTITLE_PROXY_CROP_LEFT, SUBTITLE_PROXY_CROP_TOP,
+    SUBTITLE_PROXY_CROP_WIDTH, SUBTITLE_PROXY_CROP_HEIGHT,
+    SUBTITLE_PROXY_WIDTH, SUBTITLE_PROXY_FPS, SUBTITLE_PROXY_KEEP,
+    SUBTITLE_PROXY_RESTORE_ORIGINAL,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+PROXY_VIDEO_NAME = 'proxy.mp4'
+PROXY_INFO_NAME = 'proxy_info.json'
+
+
+def _even(value: float) -> int:
+    """인코더가 요구하는 짝수 픽셀 값으로 내림 (최소 2)"""
+    return max(2, int(value) // 2 * 2)
+
+
 class SubtitleExtractor:
-    def __init__(self):
+    def __init__(self, use_proxy: bool = SUBTITLE_PROXY_ENABLED):
         """자막 추출기 초기화"""
         self.videosubfinder_path = VIDEOSUBFINDER_PATH
+        self.use_proxy = use_proxy
+        self.retry_policy = get_policy('extract')
         self.check_videosubfinder()
 
     def check_videosubfinder(self):
@@ -44,10 +66,22 @@ class SubtitleExtractor:
         results_dir = os.path.join(video_dir, 'ResultsDir')
         os.makedirs(results_dir, exist_ok=True)
 
+        input_path = video_path
+        proxy_path = None
+        if self.use_proxy:
+            proxy_path = self.create_proxy_video(video_path, results_dir)
+            if proxy_path:
+                input_path = proxy_path
+
+        # 이전 실행에서 남은 프록시 변환 정보가 현재 결과에 적용되지 않도록 정리
+        stale_info_path = os.path.join(results_dir, PROXY_INFO_NAME)
+        if proxy_path is None and os.path.exists(stale_info_path):
+            os.remove(stale_info_path)
+
         cmd = [
             self.videosubfinder_path,
             '-c', '-r', '-ccti',
-            '-i', video_path,
+            '-i', input_path,
             '-o', results_dir,
             '-te', threshold,
             *extra_opts
@@ -55,22 +89,199 @@ class SubtitleExtractor:
 
         logger.info(f"VideoSubFinder 실행: {' '.join(cmd)}")
 
+        txt_images_dir = os.path.join(results_dir, 'TXTImages')
         try:
-            result = subprocess.run(cmd, check=False)
-            txt_images_dir = os.path.join(results_dir, 'TXTImages')
-
-            if result.returncode != 0:
-                logger.warning(f"비정상 종료 코드 {result.returncode} 감지")
+            self.retry_policy.call(self._launch, cmd, txt_images_dir)
 
             if os.path.exists(txt_images_dir) and os.listdir(txt_images_dir):
                 logger.info("추출 결과 존재: 성공")
+                if proxy_path and SUBTITLE_PROXY_RESTORE_ORIGINAL:
+                    self.restore_original_frames(video_path, results_dir)
+                if PACK_TXT_IMAGES:
+                    pack_txt_images(results_dir)
                 return True
             else:
                 logger.error("추출 결과가 없어 실패로 처리")
                 return False
+        except TransientError as e:
+            logger.error(f"VideoSubFinder 재시도 후에도 실패: {video_path}, 오류: {e}")
+            return False
         except subprocess.CalledProcessError as e:
             logger.error(f"VideoSubFinder 실행 실패: {video_path}, 오류: {e.returncode}")
             raise e
+        finally:
+            if proxy_path and not SUBTITLE_PROXY_KEEP and os.path.exists(proxy_path):
+                os.remove(proxy_path)
+
+    def _launch(self, cmd: List[str], txt_images_dir: str) -> int:
+        """VideoSubFinder 프로세스 실행. 비정상 종료 후 결과가 없으면 재시도 대상 오류 발생"""
+        with subprocess.Popen(cmd) as proc:
+            try:
+                returncode, cpu_seconds = wait_with_cpu_time(proc)
+            except BaseException:
+                # subprocess.run과 같이 중단(Ctrl+C)이나 오류 시 자식 프로세스를 남기지 않음
+                proc.kill()
+                raise
+        record_subprocess('videosubfinder', cpu_seconds)
+
+        if returncode != 0:
+            logger.warning(f"비정상 종료 코드 {returncode} 감지")
+            if not (os.path.exists(txt_images_dir) and os.listdir(txt_images_dir)):
+                raise TransientError(f"VideoSubFinder 종료 코드 {returncode}, 추출 결과 없음")
+
+        return returncode
+
+    # ----------------- 프록시 영상 -----------------
+    def probe_video_size(self, video_path: str) -> Optional[Tuple[int, int]]:
+        """ffprobe로 원본 영상의 (가로, 세로) 해상도 조회"""
+        cmd = [
+            FFPROBE_PATH, '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height',
+            '-of', 'csv=p=0:s=x',
+            video_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            width, height = result.stdout.strip().splitlines()[0].split('x')[:2]
+            return int(width), int(height)
+        except (OSError, subprocess.CalledProcessError, ValueError, IndexError) as e:
+            logger.warning(f"영상 해상도 조회 실패: {video_path}, 오류: {e}")
+            return None
+
+    def create_proxy_video(self, video_path: str, results_dir: str) -> Optional[str]:
+        """자막 영역만 잘라 축소한 흑백 프록시 영상 생성
+
+        원본 좌표 복원을 위한 변환 정보는 ResultsDir/proxy_info.json에 저장한다.
+
+        Returns:
+            str | None: 프록시 영상 경로, 실패 시 None (원본 영상으로 추출 진행)
+        """
+        size = self.probe_video_size(video_path)
+        if size is None:
+            return None
+        width, height = size
+
+        crop_x = _even(width * SUBTITLE_PROXY_CROP_LEFT) if SUBTITLE_PROXY_CROP_LEFT > 0 else 0
+        crop_y = _even(height * SUBTITLE_PROXY_CROP_TOP) if SUBTITLE_PROXY_CROP_TOP > 0 else 0
+        crop_w = min(_even(width * SUBTITLE_PROXY_CROP_WIDTH), _even(width - crop_x))
+        crop_h = min(_even(height * SUBTITLE_PROXY_CROP_HEIGHT), _even(height - crop_y))
+
+        proxy_w = min(crop_w, _even(SUBTITLE_PROXY_WIDTH))
+        proxy_h = _even(crop_h * proxy_w / crop_w)
+
+        filters = [
+            f"crop={crop_w}:{crop_h}:{crop_x}:{crop_y}",
+            f"scale={proxy_w}:{proxy_h}",
+            "format=gray",
+            "format=yuv420p",
+        ]
+        if SUBTITLE_PROXY_FPS > 0:
+            filters.append(f"fps={SUBTITLE_PROXY_FPS:g}")
+
+        proxy_path = os.path.join(results_dir, PROXY_VIDEO_NAME)
+        cmd = [
+            FFMPEG_PATH, '-y', '-v', 'error',
+            '-i', video_path,
+            '-vf', ','.join(filters),
+            '-an',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '18',
+            proxy_path
+        ]
+
+        logger.info(f"프록시 영상 생성: {' '.join(cmd)}")
+        try:
+            subprocess.run(cmd, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"프록시 영상 생성 실패, 원본으로 추출합니다: {e}")
+            return None
+
+        proxy_info = {
+            'source_width': width,
+            'source_height': height,
+            'crop_x': crop_x,
+            'crop_y': crop_y,
+            'crop_width': crop_w,
+            'crop_height': crop_h,
+            'proxy_width': proxy_w,
+            'proxy_height': proxy_h,
+            'fps': SUBTITLE_PROXY_FPS,
+        }
+        with open(os.path.join(results_dir, PROXY_INFO_NAME), 'w', encoding='utf-8') as f:
+            json.dump(proxy_info, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"프록시 영상 생성 완료: {width}x{height} -> {proxy_w}x{proxy_h} (자막 영역 {crop_w}x{crop_h}+{crop_x}+{crop_y})")
+        return proxy_path
+
+    @staticmethod
+    def load_proxy_info(results_dir: str) -> Optional[Dict]:
+        """ResultsDir에 저장된 프록시 변환 정보 로드 (프록시 미사용 시 None)"""
+        info_path = os.path.join(results_dir, PROXY_INFO_NAME)
+        if not os.path.exists(info_path):
+            return None
+        with open(info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def map_to_original(proxy_info: Optional[Dict], x: float, y: float) -> Tuple[int, int]:
+        """프록시 영상(TXTImages) 좌표를 원본 프레임 좌표로 변환"""
+        if not proxy_info:
+            return int(round(x)), int(round(y))
+
+        scale_x = proxy_info['crop_width'] / proxy_info['proxy_width']
+        scale_y = proxy_info['crop_height'] / proxy_info['proxy_height']
+        return (
+            int(round(proxy_info['crop_x'] + x * scale_x)),
+            int(round(proxy_info['crop_y'] + y * scale_y)),
+        )
+
+    def restore_original_frames(self, video_path: str, results_dir: str) -> int:
+        """프록시로 찾은 TXTImages를 원본 영상의 같은 시각 프레임(컬러, 원본 해상도)의 자막 영역으로 교체
+
+        TXTImages 파일명의 표시 구간 가운데 시각으로 원본 영상에서 프레임을 뽑고, 프록시 프레임 전체(0,0 ~ 가로,세로)를
+        map_to_original로 변환한 영역을 잘라낸다. 실패하거나 시각을 알 수 없는 이미지는 프록시 결과를 유지.
+        반환값 : 교체한 이미지 수
+        """
+        proxy_info = self.load_proxy_info(results_dir)
+        txt_images_dir = os.path.join(results_dir, 'TXTImages')
+        if not proxy_info or not os.path.isdir(txt_images_dir):
+            return 0
+
+        left, top = self.map_to_original(proxy_info, 0, 0)
+        right, bottom = self.map_to_original(proxy_info, proxy_info['proxy_width'], proxy_info['proxy_height'])
+        crop = f"crop={right - left}:{bottom - top}:{left}:{top}"
+
+        restored = 0
+        names = sorted(f for f in os.listdir(txt_images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names:
+            start_ms, end_ms = parse_timestamps(name)
+            if start_ms is None:
+                continue
+            # 자막이 바뀌는 경계 프레임을 피하도록 표시 구간의 가운데 사용
+            seek_ms = (start_ms + end_ms) / 2 if end_ms is not None and end_ms >= start_ms else start_ms
+
+            image_path = os.path.join(txt_images_dir, name)
+            root, ext = os.path.splitext(image_path)
+            tmp_path = f"{root}.original{ext}"
+            cmd = [
+                FFMPEG_PATH, '-y', '-v', 'error',
+                '-ss', f"{seek_ms / 1000:.3f}",
+                '-i', video_path,
+                '-frames:v', '1',
+                '-vf', crop,
+                tmp_path
+            ]
+            try:
+                subprocess.run(cmd, check=True)
+                os.replace(tmp_path, image_path)
+                restored += 1
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.warning(f"원본 프레임 복원 실패, 프록시 이미지를 유지합니다: {name}, 오류: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        logger.info(f"원본 프레임으로 복원: {restored}/{len(names)}개 ({crop})")
+        return restored
 
     # ----------------- 퍼블릭 메서드 -----------------
     def extract_subtitles(self, video_path: str) -> bool:
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+job_queue 임대/하트비트/만료/완료 동작 테스트 (임시 SQLite 파일 + 가짜 시계)
+
+실행: python -m pytest test_job_queue.py
+"""
+
+import os
+
+# config는 import 시 API 키를 확인하므로 테스트용 값 지정
+os.environ.setdefault('YOUTUBE_API_KEY', 'test-key')
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue
+
+LEASE_SECONDS = 10
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(job_queue.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / 'jobs.sqlite'), lease_seconds=LEASE_SECONDS, max_attempts=2)
+
+
+def get_job(queue: JobQueue, video_id: str, stage: str):
+    row = queue._connect().execute(
+        "SELECT * FROM jobs WHERE video_id = ? AND stage = ?", (video_id, stage)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def test_heartbeat_extends_lease(queue, clock):
+    queue.enqueue('v1', {'n': 1})
+    job = queue.lease('w1', ['download'])
+    assert job['video_id'] == 'v1' and job['attempts'] == 1
+    assert job['payload'] == {'n': 1}
+
+    clock.advance(LEASE_SECONDS - 2)
+    assert queue.heartbeat(job['id'], 'w1')
+    assert not queue.heartbeat(job['id'], 'w2')
+
+    # 처음 임대 만료 시각은 지났지만 연장되었으므로 다른 워커가 가져갈 수 없음
+    clock.advance(5)
+    assert queue.lease('w2', ['download']) is None
+    assert get_job(queue, 'v1', 'download')['worker_id'] == 'w1'
+
+
+def test_expired_lease_requeued_until_max_attempts(queue, clock):
+    queue.enqueue('v1', {})
+    first = queue.lease('w1', ['download'])
+
+    clock.advance(LEASE_SECONDS + 1)
+    second = queue.lease('w2', ['download'])
+    assert second['id'] == first['id']
+    assert second['attempts'] == 2
+
+    # 최대 시도 횟수에 도달한 뒤 만료되면 다시 대기열에 넣지 않고 실패 처리
+    clock.advance(LEASE_SECONDS + 1)
+    assert queue.lease('w3', ['download']) is None
+    job = get_job(queue, 'v1', 'download')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'lease expired'
+    assert not queue.has_unfinished(['download'])
+
+
+def test_complete_after_lost_lease_returns_false(queue, clock):
+    queue.enqueue('v1', {})
+    stale = queue.lease('w1', ['download'])
+
+    clock.advance(LEASE_SECONDS + 1)
+    current = queue.lease('w2', ['download'])
+
+    assert not queue.heartbeat(stale['id'], 'w1')
+    assert not queue.complete(stale, 'w1', {'path': 'stale'})
+    assert get_job(queue, 'v1', 'extract') is None
+
+    assert queue.complete(current, 'w2', {'path': 'current'})
+    assert get_job(queue, 'v1', 'extract')['payload'] == '{"path": "current"}'
+
+
+def test_next_stage_inserted_only_on_success(queue, clock):
+    queue.enqueue('v1', {})
+    job = queue.lease('w1', ['download'])
+
+    assert queue.fail(job, 'w1', 'network error')
+    assert get_job(queue, 'v1', 'extract') is None
+    assert get_job(queue, 'v1', 'download')['status'] == 'pending'
+
+    job = queue.lease('w1', ['download'])
+    assert queue.complete(job, 'w1', {'path': 'v1.mp4'})
+    extract = get_job(queue, 'v1', 'extract')
+    assert extract['status'] == 'pending'
+
+    # 다음 단계 payload가 없으면(None) 다음 작업을 만들지 않음
+    job = queue.lease('w1', ['extract'])
+    assert job['id'] == extract['id']
+    assert queue.complete(job, 'w1', None)
+    assert get_job(queue, 'v1', 'combine') is None
+    assert queue.get_counts()['download'] == {'done': 1}
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+retry 오류 분류표와 재시도/서킷 브레이커 동작 테스트 (가짜 시계, sleep 없음)
+
+실행: python -m pytest test_retry.py
+"""
+
+import os
+import json
+import socket
+
+# config는 import 시 API 키를 확인하므로 테스트용 값 지정
+os.environ.setdefault('YOUTUBE_API_KEY', 'test-key')
+
+import pytest
+
+import retry
+from retry import (CircuitBreaker, CircuitOpenError, RetryPolicy, TransientError,
+                   classify_error, is_quota_error)
+
+
+class FakeResp(dict):
+    """googleapiclient HttpError.resp (httplib2.Response: dict + status)"""
+
+    def __init__(self, status: int, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """googleapiclient.errors.HttpError와 같은 속성(resp, content)을 가진 오류"""
+
+    def __init__(self, status: int, reason: str = '', headers=None):
+        super().__init__(f"HTTP {status} {reason}")
+        self.resp = FakeResp(status, headers)
+        self.content = json.dumps({'error': {'errors': [{'reason': reason}] if reason else []}}).encode()
+
+
+class FakeRequestsError(Exception):
+    """requests.HTTPError와 같은 속성(response.status_code, headers)을 가진 오류"""
+
+    def __init__(self, status: int, headers=None):
+        super().__init__(f"{status} error")
+        self.response = type('Response', (), {'status_code': status, 'headers': headers or {}})()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(retry.time, 'sleep', fake.sleep)
+    # 지터 없이 최대 대기 시간 사용
+    monkeypatch.setattr(retry.random, 'uniform', lambda low, high: high)
+    return fake
+
+
+def make_policy(max_attempts: int = 3, failure_threshold: int = 5) -> RetryPolicy:
+    breaker = CircuitBreaker('test', failure_threshold=failure_threshold, reset_timeout=60)
+    return RetryPolicy('test', max_attempts=max_attempts, base_delay=1.0, max_delay=30.0, breaker=breaker)
+
+
+def failing(*errors, result='ok'):
+    """errors를 차례로 발생시킨 뒤 result를 반환하는 함수와 호출 횟수"""
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+
+# ----------------- 오류 분류 -----------------
+@pytest.mark.parametrize('exc, expected', [
+    (FakeHttpError(403, 'quotaExceeded'), ('quota', None)),
+    (FakeHttpError(403, 'dailyLimitExceeded'), ('quota', None)),
+    (FakeHttpError(403, 'rateLimitExceeded'), ('rate_limit', None)),
+    (FakeHttpError(403, 'userRateLimitExceeded'), ('rate_limit', None)),
+    (FakeHttpError(403, 'forbidden'), ('forbidden', None)),
+    (FakeHttpError(429, '', {'retry-after': '7'}), ('rate_limit', 7.0)),
+    (FakeHttpError(503, '', {'retry-after': '12'}), ('server', 12.0)),
+    (FakeHttpError(500), ('server', None)),
+    (FakeHttpError(404, 'notFound'), ('fatal', None)),
+    (FakeRequestsError(429, {'Retry-After': '3'}), ('rate_limit', 3.0)),
+    (FakeRequestsError(502), ('server', None)),
+    (FakeRequestsError(429, {'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}), ('rate_limit', None)),
+    (TransientError('VideoSubFinder 비정상 종료', retry_after=4), ('transient', 4)),
+    (ConnectionResetError(), ('network', None)),
+    (TimeoutError(), ('network', None)),
+    (socket.timeout(), ('network', None)),
+    (Exception('ERROR: unable to download video data: HTTP Error 429: Too Many Requests'), ('rate_limit', None)),
+    (Exception('ERROR: unable to download video data: HTTP Error 403: Forbidden'), ('forbidden', None)),
+    (Exception('HTTP Error 503: Service Unavailable'), ('server', None)),
+    (Exception('HTTP Error 404: Not Found'), ('fatal', None)),
+    (Exception('Read timed out. (read timeout=20)'), ('network', None)),
+    (Exception('Connection reset by peer'), ('network', None)),
+    (Exception('Video unavailable'), ('fatal', None)),
+    (ValueError('bad value'), ('fatal', None)),
+])
+def test_classify_error(exc, expected):
+    assert classify_error(exc) == expected
+
+
+def test_is_quota_error():
+    assert is_quota_error(FakeHttpError(403, 'quotaExceeded'))
+    assert not is_quota_error(FakeHttpError(403, 'rateLimitExceeded'))
+    assert is_quota_error(CircuitOpenError('차단됨', 'quota'))
+    assert not is_quota_error(CircuitOpenError('열림'))
+
+
+# ----------------- 재시도 -----------------
+def test_retries_retryable_errors_then_succeeds(clock):
+    policy = make_policy()
+    func, calls = failing(ConnectionResetError(), FakeHttpError(500))
+
+    assert policy.call(func) == 'ok'
+    assert len(calls) == 3
+    # 지수 백오프: network 2s * 2^0, server 1s * 2^1
+    assert clock.sleeps == [2.0, 2.0]
+    assert policy.stats['retries'] == 2
+    assert policy.stats['error:network'] == 1 and policy.stats['error:server'] == 1
+
+
+def test_retry_after_is_minimum_delay(clock):
+    policy = make_policy()
+    func, _ = failing(FakeHttpError(429, '', {'retry-after': '20'}))
+
+    assert policy.call(func) == 'ok'
+    assert clock.sleeps == [20.0]
+
+
+def test_delay_capped_by_max_delay():
+    policy = make_policy()
+    for attempt in range(10):
+        assert policy.get_delay(attempt, 'rate_limit') <= policy.max_delay
+
+
+def test_gives_up_after_max_attempts(clock):
+    policy = make_policy(max_attempts=3)
+    func, calls = failing(*(FakeHttpError(503) for _ in range(5)))
+
+    with pytest.raises(FakeHttpError):
+        policy.call(func)
+    assert len(calls) == 3
+    assert len(clock.sleeps) == 2
+    assert policy.stats['failures'] == 1
+
+
+@pytest.mark.parametrize('exc', [FakeHttpError(403, 'forbidden'), FakeHttpError(404), ValueError('bad')])
+def test_non_retryable_errors_raise_immediately(clock, exc):
+    policy = make_policy()
+    func, calls = failing(exc)
+
+    with pytest.raises(type(exc)):
+        policy.call(func)
+    assert len(calls) == 1
+    assert clock.sleeps == []
+    # 재시도하지 않는 오류는 서킷 브레이커 실패로 세지 않음
+    assert policy.breaker._failures == 0
+
+
+# ----------------- 서킷 브레이커 -----------------
+def test_quota_error_blocks_further_calls(clock):
+    policy = make_policy()
+    func, calls = failing(FakeHttpError(403, 'quotaExceeded'))
+
+    with pytest.raises(FakeHttpError):
+        policy.call(func)
+    assert len(calls) == 1
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        policy.call(func)
+    assert excinfo.value.error_class == 'quota'
+    assert is_quota_error(excinfo.value)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_after_consecutive_failures_and_pauses(clock):
+    policy = make_policy(max_attempts=1, failure_threshold=2)
+    for _ in range(2):
+        func, _ = failing(FakeHttpError(500))
+        with pytest.raises(FakeHttpError):
+            policy.call(func)
+    assert policy.breaker.open_count == 1
+
+    # 서킷이 열린 동안에는 reset_timeout만큼 기다린 뒤 호출
+    func, calls = failing()
+    assert policy.call(func) == 'ok'
+    assert clock.sleeps == [60.0]
+    assert len(calls) == 1
+
+
+def test_success_resets_failure_count(clock):
+    policy = make_policy(max_attempts=1, failure_threshold=2)
+    func, _ = failing(FakeHttpError(500))
+    with pytest.raises(FakeHttpError):
+        policy.call(func)
+
+    assert policy.call(failing()[0]) == 'ok'
+    assert policy.breaker._failures == 0
+
+    func, _ = failing(FakeHttpError(500))
+    with pytest.raises(FakeHttpError):
+        policy.call(func)
+    assert policy.breaker.open_count == 0
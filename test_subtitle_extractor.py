@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+subtitle_extractor 프록시 좌표 변환 / 원본 프레임 복원 테스트 (ffmpeg 호출은 가짜로 대체)
+
+실행: python -m pytest test_subtitle_extractor.py
+"""
+
+import os
+import json
+import subprocess
+
+# config는 import 시 API 키를 확인하므로 테스트용 값 지정
+os.environ.setdefault('YOUTUBE_API_KEY', 'test-key')
+
+import pytest
+
+import subtitle_extractor
+from subtitle_extractor import SubtitleExtractor, PROXY_INFO_NAME
+
+# 1080x1920 원본에서 y=1200부터 1080x400 영역을 잘라 540x200으로 축소한 프록시
+PROXY_INFO = {
+    'source_width': 1080, 'source_height': 1920,
+    'crop_x': 0, 'crop_y': 1200, 'crop_width': 1080, 'crop_height': 400,
+    'proxy_width': 540, 'proxy_height': 200, 'fps': 0,
+}
+
+FRAME_NAME = '0_00_01_000__0_00_03_000_0001.jpeg'
+
+
+@pytest.fixture
+def results_dir(tmp_path):
+    results = tmp_path / 'ResultsDir'
+    (results / 'TXTImages').mkdir(parents=True)
+    (results / PROXY_INFO_NAME).write_text(json.dumps(PROXY_INFO), encoding='utf-8')
+    return results
+
+
+@pytest.fixture
+def extractor():
+    return SubtitleExtractor(use_proxy=True)
+
+
+def test_map_to_original():
+    assert SubtitleExtractor.map_to_original(PROXY_INFO, 0, 0) == (0, 1200)
+    assert SubtitleExtractor.map_to_original(PROXY_INFO, 540, 200) == (1080, 1600)
+    assert SubtitleExtractor.map_to_original(PROXY_INFO, 100.4, 50) == (201, 1300)
+
+
+def test_map_to_original_without_proxy():
+    assert SubtitleExtractor.map_to_original(None, 12.6, 7.2) == (13, 7)
+
+
+def test_load_proxy_info(results_dir, tmp_path):
+    assert SubtitleExtractor.load_proxy_info(str(results_dir)) == PROXY_INFO
+    assert SubtitleExtractor.load_proxy_info(str(tmp_path)) is None
+
+
+def test_restore_original_frames(results_dir, extractor, monkeypatch):
+    txt_images = results_dir / 'TXTImages'
+    (txt_images / FRAME_NAME).write_bytes(b'proxy')
+    (txt_images / 'unknown.png').write_bytes(b'proxy')
+
+    calls = []
+
+    def fake_run(cmd, check):
+        calls.append(cmd)
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'original')
+
+    monkeypatch.setattr(subtitle_extractor.subprocess, 'run', fake_run)
+
+    assert extractor.restore_original_frames('video.mp4', str(results_dir)) == 1
+    assert (txt_images / FRAME_NAME).read_bytes() == b'original'
+    # 시각을 알 수 없는 이미지는 그대로 유지
+    assert (txt_images / 'unknown.png').read_bytes() == b'proxy'
+    assert sorted(os.listdir(txt_images)) == sorted([FRAME_NAME, 'unknown.png'])
+
+    cmd = calls[0]
+    assert cmd[cmd.index('-ss') + 1] == '2.000'
+    assert cmd[cmd.index('-i') + 1] == 'video.mp4'
+    assert cmd[cmd.index('-vf') + 1] == 'crop=1080:400:0:1200'
+
+
+def test_restore_keeps_proxy_image_on_failure(results_dir, extractor, monkeypatch):
+    txt_images = results_dir / 'TXTImages'
+    (txt_images / FRAME_NAME).write_bytes(b'proxy')
+
+    def failing_run(cmd, check):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'partial')
+        raise subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(subtitle_extractor.subprocess, 'run', failing_run)
+
+    assert extractor.restore_original_frames('video.mp4', str(results_dir)) == 0
+    assert (txt_images / FRAME_NAME).read_bytes() == b'proxy'
+    assert os.listdir(txt_images) == [FRAME_NAME]
+
+
+def test_restore_without_proxy_info(tmp_path, extractor):
+    (tmp_path / 'TXTImages').mkdir()
+    assert extractor.restore_original_frames('video.mp4', str(tmp_path)) == 0
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+영상 썸네일을 연결 풀을 공유하여 일괄 다운로드하는 모듈
+"""
+
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from retry import get_policy
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailFetcher:
+    def __init__(self, max_workers: int = config.THUMBNAIL_WORKERS, timeout: float = config.THUMBNAIL_TIMEOUT):
+        """썸네일 다운로더 초기화 (keep-alive 세션 하나를 모든 작업이 공유)"""
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.retry_policy = get_policy('thumbnail')
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # 여러 번 호출되어도 (감시 모드 등) 같은 스레드 풀을 재사용
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def _load_meta(self, meta_path: str) -> Dict:
+        if not os.path.exists(meta_path):
+            return {}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _request(self, url: str, headers: Dict) -> requests.Response:
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    def fetch(self, url: str, video_folder_path: str) -> str:
+        """썸네일 하나 다운로드. 'downloaded' / 'not_modified' 반환
+
+        이전에 받은 썸네일이 있으면 ETag/Last-Modified로 조건부 요청을 보낸다.
+        """
+        image_path = os.path.join(video_folder_path, config.THUMBNAIL_FILENAME)
+        meta_path = os.path.join(video_folder_path, config.THUMBNAIL_META_FILENAME)
+
+        headers = {}
+        meta = self._load_meta(meta_path)
+        if meta.get('url') == url and os.path.exists(image_path):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.retry_policy.call(self._request, url, headers)
+        if response.status_code == 304:
+            return 'not_modified'
+
+        tmp_path = image_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, image_path)
+
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }, f, ensure_ascii=False, indent=2)
+
+        return 'downloaded'
+
+    def fetch_all(self, items: List[Dict]) -> Dict[str, int]:
+        """여러 썸네일을 동시에 다운로드
+
+        items : [{'url': 썸네일 URL, 'folder': 저장할 영상 폴더}, ...]
+        반환값 : {'downloaded': n, 'not_modified': n, 'failed': n}
+        """
+        result = {'downloaded': 0, 'not_modified': 0, 'failed': 0}
+        items = [item for item in items if item.get('url')]
+        if not items:
+            return result
+
+        futures = {self.executor.submit(self.fetch, item['url'], item['folder']): item for item in items}
+        for future in as_completed(futures):
+            try:
+                result[future.result()] += 1
+            except Exception as e:
+                result['failed'] += 1
+                logger.error(f"썸네일 다운로드 실패: {futures[future]['url']}, 오류: {e}")
+
+        logger.info(f"썸네일 처리 결과: {result}")
+        return result
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+다운로드 전에 영상 메타데이터로 처리 대상을 골라내는 필터 모듈
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Optional
+
+import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class VideoFilter:
+    def __init__(self,
+                 min_views: int = config.FILTER_MIN_VIEWS,
+                 min_likes: int = config.FILTER_MIN_LIKES,
+                 min_comments: int = config.FILTER_MIN_COMMENTS,
+                 min_engagement: float = config.FILTER_MIN_ENGAGEMENT,
+                 min_duration: int = config.FILTER_MIN_DURATION,
+                 max_duration: int = config.FILTER_MAX_DURATION,
+                 include_keywords: Optional[List[str]] = None,
+                 exclude_keywords: Optional[List[str]] = None,
+                 top_n_per_channel: int = config.FILTER_TOP_N_PER_CHANNEL,
+                 strict_shorts: bool = config.FILTER_STRICT_SHORTS):
+        """필터 규칙 초기화 (기본값은 config.py의 FILTER_* 설정)"""
+        self.min_views = min_views
+        self.min_likes = min_likes
+        self.min_comments = min_comments
+        self.min_engagement = min_engagement
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        if include_keywords is None:
+            include_keywords = config.FILTER_INCLUDE_KEYWORDS
+        if exclude_keywords is None:
+            exclude_keywords = config.FILTER_EXCLUDE_KEYWORDS
+        self.include_keywords = [k.lower() for k in include_keywords]
+        self.exclude_keywords = [k.lower() for k in exclude_keywords]
+        self.top_n_per_channel = top_n_per_channel
+        self.strict_shorts = strict_shorts
+
+        # 마지막 apply() 호출에서 규칙별로 제외된 영상 수
+        self.rejected = Counter()
+
+    def is_active(self) -> bool:
+        """적용할 규칙이 하나라도 있는지 여부"""
+        return any([
+            self.min_views, self.min_likes, self.min_comments, self.min_engagement,
+            self.min_duration, self.max_duration, self.include_keywords,
+            self.exclude_keywords, self.top_n_per_channel, self.strict_shorts,
+        ])
+
+    def apply(self, videos: List[Dict]) -> List[Dict]:
+        """발견된 전체 영상 목록에 규칙을 일괄 적용하여 통과한 영상만 반환 (원래 순서 유지)"""
+        self.rejected = Counter()
+
+        passed = []
+        for video in videos:
+            reason = self.check(video)
+            if reason:
+                self.rejected[reason] += 1
+                logger.debug(f"필터 제외 ({reason}): {video['title']}")
+            else:
+                passed.append(video)
+
+        if self.top_n_per_channel:
+            passed = self._keep_top_n_per_channel(passed)
+
+        logger.info(f"필터 적용 결과: {len(passed)}/{len(videos)}개 통과, 제외 사유: {dict(self.rejected)}")
+        return passed
+
+    def check(self, video: Dict) -> Optional[str]:
+        """영상 단위 규칙 검사. 통과하면 None, 아니면 제외 사유 반환"""
+        views = video.get('view_count', 0)
+        likes = video.get('like_count', 0)
+        comments = video.get('comment_count', 0)
+
+        if views < self.min_views:
+            return 'min_views'
+        if likes < self.min_likes:
+            return 'min_likes'
+        if comments < self.min_comments:
+            return 'min_comments'
+        if self.min_engagement and self.engagement_ratio(video) < self.min_engagement:
+            return 'min_engagement'
+
+        duration = video.get('duration_seconds', 0)
+        if duration < self.min_duration:
+            return 'min_duration'
+        if self.max_duration and duration > self.max_duration:
+            return 'max_duration'
+
+        text = self._searchable_text(video)
+        if self.include_keywords and not any(k in text for k in self.include_keywords):
+            return 'include_keywords'
+        if any(k in text for k in self.exclude_keywords):
+            return 'exclude_keywords'
+
+        if self.strict_shorts and not self.is_strict_shorts(video):
+            return 'strict_shorts'
+
+        return None
+
+    @staticmethod
+    def engagement_ratio(video: Dict) -> float:
+        """참여율 = (좋아요 + 댓글) / 조회수"""
+        views = video.get('view_count', 0)
+        if not views:
+            return 0.0
+        return (video.get('like_count', 0) + video.get('comment_count', 0)) / views
+
+    @staticmethod
+    def is_strict_shorts(video: Dict) -> bool:
+        """#shorts 태그가 제목/설명/태그에 명시된 60초 이하 영상만 쇼츠로 판단"""
+        if video.get('duration_seconds', 0) > 60:
+            return False
+        if '#shorts' in video.get('title', '').lower():
+            return True
+        if '#shorts' in video.get('description', '').lower():
+            return True
+        return any(tag.lower().lstrip('#') == 'shorts' for tag in video.get('tags', []))
+
+    def _searchable_text(self, video: Dict) -> str:
+        """키워드 검사 대상 텍스트 (제목 + 설명 + 태그)"""
+        parts = [video.get('title', ''), video.get('description', '')]
+        parts.extend(video.get('tags', []))
+        return '\n'.join(parts).lower()
+
+    def _keep_top_n_per_channel(self, videos: List[Dict]) -> List[Dict]:
+        """채널별 조회수 상위 N개만 남김"""
+        by_channel = defaultdict(list)
+        for video in videos:
+            by_channel[video.get('channel_id')].append(video)
+
+        keep_ids = set()
+        for channel_videos in by_channel.values():
+            ranked = sorted(channel_videos, key=lambda v: v.get('view_count', 0), reverse=True)
+            keep_ids.update(v['video_id'] for v in ranked[:self.top_n_per_channel])
+
+        kept = [v for v in videos if v['video_id'] in keep_ids]
+        self.rejected['top_n_per_channel'] += len(videos) - len(kept)
+        return kept
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+감시 목록의 채널들을 주기적으로 확인하여 새 쇼츠를 바로 처리하는 상주(데몬) 모듈
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import config
+from youtube_api import YouTubeAPI
+from video_filter import VideoFilter
+from quota_planner import BudgetExceededError, get_budget
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 채널별로 기억할 최근 영상 ID / 업로드 시각 개수
+MAX_SEEN_IDS = 500
+MAX_UPLOAD_HISTORY = 20
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class WatchDaemon:
+    def __init__(self,
+                 youtube_api: YouTubeAPI,
+                 video_filter: VideoFilter,
+                 process: Callable[[List[Dict], str], Dict],
+                 watchlist_file: str = config.WATCHLIST_FILE,
+                 state_file: str = config.WATCH_STATE_FILE):
+        """감시 데몬 초기화
+
+        process : (새 영상 목록, 채널 폴더 경로)를 받아 다운로드~합성을 수행하고
+                  처리 결과(processed_ids: 끝까지 처리한 영상 ID, remaining: 미룬 영상)를 반환하는 함수
+        """
+        self.youtube_api = youtube_api
+        self.video_filter = video_filter
+        self.process = process
+        self.watchlist_file = watchlist_file
+        self.state_file = state_file
+
+        self.channels: Dict[str, Dict] = {}
+        self.state: Dict[str, Dict] = self._load_state()
+        self._watchlist_mtime = None
+        self._stop = threading.Event()
+
+    # ----------------- 감시 목록 / 상태 -----------------
+    def load_watchlist(self):
+        """감시 목록 파일을 (변경되었을 때만) 다시 읽기
+
+        형식: ["채널 URL", ...] 또는 [{"url": ..., "interval": 초, "since": "YYYY-MM-DD"}, ...]
+        """
+        mtime = os.path.getmtime(self.watchlist_file)
+        if mtime == self._watchlist_mtime:
+            return
+        self._watchlist_mtime = mtime
+
+        with open(self.watchlist_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+        channels = {}
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'url': entry}
+            channels[entry['url']] = entry
+        self.channels = channels
+
+        for url, entry in channels.items():
+            channel_state = self.state.setdefault(url, {})
+            channel_state.setdefault('since', entry.get('since') or datetime.now(timezone.utc).strftime('%Y-%m-%d'))
+            channel_state.setdefault('seen_ids', [])
+            channel_state.setdefault('failures', {})
+            channel_state.setdefault('upload_times', [])
+            channel_state.setdefault('next_poll', 0)
+            channel_state['interval'] = entry.get('interval', channel_state.get('interval', config.WATCH_DEFAULT_INTERVAL))
+
+        logger.info(f"감시 목록 로드: 채널 {len(channels)}개")
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"감시 상태 파일을 읽을 수 없어 새로 시작합니다: {e}")
+            return {}
+
+    def save_state(self):
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    # ----------------- 확인 간격 -----------------
+    def get_poll_interval(self, url: str) -> float:
+        """업로드 빈도에 맞춘 다음 확인 간격 (무작위 편차 포함)
+
+        감시 목록에 interval을 직접 지정하면 업로드 이력이 쌓이기 전까지 그 값을 사용하고,
+        "adaptive": false이면 항상 그 값을 사용한다.
+        """
+        entry = self.channels.get(url, {})
+        channel_state = self.state[url]
+        interval = channel_state['interval']
+
+        upload_times = sorted(_parse_time(t) for t in channel_state['upload_times'])
+        if entry.get('adaptive', True) and len(upload_times) >= 2:
+            span = (upload_times[-1] - upload_times[0]).total_seconds()
+            mean_gap = span / (len(upload_times) - 1)
+            interval = mean_gap / config.WATCH_POLLS_PER_UPLOAD
+            interval = min(config.WATCH_MAX_INTERVAL, max(config.WATCH_MIN_INTERVAL, interval))
+
+        jitter = interval * config.WATCH_JITTER
+        return interval + random.uniform(-jitter, jitter)
+
+    # ----------------- 확인 / 처리 -----------------
+    def poll_channel(self, url: str) -> int:
+        """채널 하나를 확인하여 새 쇼츠를 처리. 처리 대상 영상 수 반환"""
+        channel_state = self.state[url]
+
+        channel_id = self.youtube_api.extract_channel_id(url)
+        if channel_id is None:
+            logger.error(f"채널 ID를 가져오지 못했습니다: {url}")
+            return 0
+
+        # 반복 확인이므로 search.list(100 units) 대신 업로드 재생목록(페이지당 2 units)으로 조회
+        videos = self.youtube_api.get_recent_shorts(channel_id, channel_state['since'])
+        seen = set(channel_state['seen_ids'])
+        new_videos = [v for v in videos if v['video_id'] not in seen]
+        if not new_videos:
+            return 0
+
+        # 필터에서 제외된 영상은 기록하지 않아, 같은 기간 안에서는 다음 확인 때 다시 평가
+        targets = self.video_filter.apply(new_videos) if self.video_filter.is_active() else new_videos
+        logger.info(f"새 쇼츠 {len(new_videos)}개 발견, 처리 대상 {len(targets)}개: {url}")
+
+        retry_videos = []
+        if targets:
+            channel_name = self.youtube_api.get_channel_name(url)
+            channel_path = os.path.join(config.BASE_DOWNLOAD_PATH, channel_name)
+            result = self.process(targets, channel_path) or {}
+            retry_videos = self._record_results(channel_state, targets, result)
+
+        for video in new_videos:
+            channel_state['upload_times'].append(video['upload_date'])
+        channel_state['seen_ids'] = channel_state['seen_ids'][-MAX_SEEN_IDS:]
+        channel_state['upload_times'] = sorted(set(channel_state['upload_times']))[-MAX_UPLOAD_HISTORY:]
+
+        # 가장 최근 업로드 날짜부터 다시 검색 (날짜 단위이므로 같은 날 영상은 seen_ids로 거름)
+        # 다시 시도할 영상이 있으면 그 영상이 검색 범위에 남도록 그 업로드 날짜 이후로만 이동
+        since = max(_parse_time(v['upload_date']) for v in new_videos)
+        if retry_videos:
+            since = min(since, min(_parse_time(v['upload_date']) for v in retry_videos))
+        channel_state['since'] = max(channel_state['since'], since.strftime('%Y-%m-%d'))
+        return len(targets)
+
+    def _record_results(self, channel_state: Dict, targets: List[Dict], result: Dict) -> List[Dict]:
+        """처리 결과를 상태에 반영하고 다음 확인 때 다시 시도할 영상 목록 반환
+
+        끝까지 처리한 영상만 seen_ids에 기록한다. 공간/예산 부족으로 미룬 영상은 그대로 다시 시도하고,
+        실패한 영상은 WATCH_MAX_VIDEO_ATTEMPTS번까지 다시 시도한다.
+        """
+        processed = set(result.get('processed_ids', []))
+        deferred = {video['video_id'] for video in result.get('remaining', [])}
+        failures = channel_state['failures']
+
+        retry_videos = []
+        for video in targets:
+            video_id = video['video_id']
+            if video_id in processed:
+                channel_state['seen_ids'].append(video_id)
+                failures.pop(video_id, None)
+            elif video_id in deferred:
+                retry_videos.append(video)
+            else:
+                failures[video_id] = failures.get(video_id, 0) + 1
+                if failures[video_id] >= config.WATCH_MAX_VIDEO_ATTEMPTS:
+                    logger.warning(f"{failures[video_id]}번 처리에 실패하여 건너뜁니다: {video['title']}")
+                    channel_state['seen_ids'].append(video_id)
+                    del failures[video_id]
+                else:
+                    retry_videos.append(video)
+
+        if retry_videos:
+            logger.info(f"다음 확인 때 다시 시도할 영상 {len(retry_videos)}개")
+        return retry_videos
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """감시 루프 실행 (stop() 또는 KeyboardInterrupt까지)"""
+        logger.info("감시 모드 시작")
+        while not self._stop.is_set():
+            try:
+                self.load_watchlist()
+            except (OSError, ValueError) as e:
+                logger.error(f"감시 목록을 읽을 수 없습니다: {self.watchlist_file}, 오류: {e}")
+                if not self.channels:
+                    raise
+
+            if not self.channels:
+                self._stop.wait(config.WATCH_MIN_INTERVAL)
+                continue
+
+            url = min(self.channels, key=lambda u: self.state[u]['next_poll'])
+            wait = self.state[url]['next_poll'] - time.time()
+            if wait > 0:
+                # 감시 목록 변경을 반영하기 위해 최대 WATCH_MIN_INTERVAL마다 깨어남
+                self._stop.wait(min(wait, config.WATCH_MIN_INTERVAL))
+                continue
+
+            # 다운로드 용량 예산은 감시 모드에서 하루 단위로 적용
+            # 소진된 동안에는 확인해도 모두 미뤄지므로 할당량을 쓰지 않도록 확인을 건너뜀
+            budget = get_budget()
+            if budget.reset_bandwidth_if_new_day():
+                logger.info("날짜가 바뀌어 다운로드 용량 예산을 초기화했습니다.")
+            try:
+                if budget.allows_download():
+                    self.poll_channel(url)
+                else:
+                    logger.warning(f"{budget.exhausted_reason}: 다음 날까지 채널 확인을 건너뜁니다 - {url}")
+            except BudgetExceededError as e:
+                logger.error(f"예산 소진으로 감시 모드를 종료합니다: {e}")
+                break
+            except Exception as e:
+                logger.error(f"채널 확인 중 오류 - {url}: {e}", exc_info=True)
+
+            interval = self.get_poll_interval(url)
+            self.state[url]['last_poll'] = time.time()
+            self.state[url]['next_poll'] = time.time() + interval
+            self.save_state()
+            logger.info(f"다음 확인: {interval / 60:.0f}분 후 - {url}")
+
+        logger.info("감시 모드 종료")
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+디스크 예산 안에서 작업 공간을 관리하고 중간 산출물을 정리하는 모듈
+"""
+
+import os
+import time
+import shutil
+import logging
+from typing import Dict, Optional
+
+import config
+from frame_pack import get_pack_paths
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+RETENTION_ACTIONS = ('keep', 'delete', 'compress')
+
+
+def get_dir_size(path: str) -> int:
+    """폴더(또는 파일)의 전체 바이트 크기"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class WorkspaceManager:
+    def __init__(self,
+                 base_path: str = config.BASE_DOWNLOAD_PATH,
+                 scratch_path: str = config.WORKSPACE_SCRATCH_PATH,
+                 disk_budget_gb: float = config.WORKSPACE_DISK_BUDGET_GB,
+                 min_free_gb: float = config.WORKSPACE_MIN_FREE_GB,
+                 retention: Optional[Dict[str, str]] = None):
+        """작업 공간 관리자 초기화"""
+        self.base_path = base_path
+        self.scratch_path = scratch_path or None
+        self.disk_budget = int(disk_budget_gb * GB)
+        self.min_free = int(min_free_gb * GB)
+        self.retention = dict(config.WORKSPACE_RETENTION)
+        if retention:
+            self.retention.update(retention)
+
+        for artifact, action in self.retention.items():
+            if action not in RETENTION_ACTIONS:
+                raise ValueError(f"❌ 알 수 없는 보존 정책: {artifact}={action} (keep/delete/compress 중 선택)")
+        if self.retention.get('video') == 'compress':
+            raise ValueError("❌ 영상 파일은 압축 정책을 지원하지 않습니다 (keep/delete 중 선택)")
+
+        # 아직 합성/정리 전인 영상 폴더별 사용량 (정리가 끝나면 추적에서 제외)
+        self.tracked_usage: Dict[str, int] = {}
+        self.freed_bytes = 0
+
+        if self.scratch_path:
+            os.makedirs(self.scratch_path, exist_ok=True)
+            logger.info(f"다운로드 임시 경로: {self.scratch_path}")
+
+    # ----------------- 경로 -----------------
+    def get_staging_path(self, channel_path: str) -> str:
+        """다운로드를 받을 경로 (임시 경로가 있으면 그 아래 채널 폴더)"""
+        if not self.scratch_path:
+            return channel_path
+        staging_path = os.path.join(self.scratch_path, os.path.basename(channel_path))
+        os.makedirs(staging_path, exist_ok=True)
+        return staging_path
+
+    # ----------------- 용량 확인 -----------------
+    def get_used_bytes(self) -> int:
+        """정리로 줄일 수 있는 작업 공간 사용량 (임시 경로 + 정리 전인 영상 폴더)
+
+        정리 후에도 보존 정책에 따라 남는 결과물(영상, 압축본, 합성 이미지)은 포함하지 않는다.
+        """
+        used = sum(self.tracked_usage.values())
+        if self.scratch_path and os.path.exists(self.scratch_path):
+            used += get_dir_size(self.scratch_path)
+        return used
+
+    def get_free_bytes(self) -> int:
+        """다운로드 경로(없으면 상위 경로)가 있는 디스크의 남은 용량"""
+        paths = [self.scratch_path, self.base_path]
+        free = None
+        for path in filter(None, paths):
+            while path and not os.path.exists(path):
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+            if path and os.path.exists(path):
+                path_free = shutil.disk_usage(path).free
+                free = path_free if free is None else min(free, path_free)
+        return free if free is not None else 0
+
+    def has_space(self) -> bool:
+        """새 다운로드를 시작해도 되는지 (워터마크 및 예산 기준)"""
+        if self.get_free_bytes() < self.min_free:
+            return False
+        return not self.is_over_budget()
+
+    def is_over_budget(self) -> bool:
+        """작업 공간 예산 초과 여부"""
+        return bool(self.disk_budget) and self.get_used_bytes() >= self.disk_budget
+
+    def wait_for_space(self,
+                       interval: float = config.WORKSPACE_PAUSE_INTERVAL,
+                       timeout: float = config.WORKSPACE_PAUSE_TIMEOUT) -> bool:
+        """공간이 확보될 때까지 다운로드 일시 중지. 시간 내 확보되면 True
+
+        남은 디스크 용량(워터마크)은 다른 프로그램이 공간을 비우면 회복될 수 있어 기다리지만,
+        작업 공간 예산 초과는 이 실행의 정리로만 줄어들므로 기다리지 않고 바로 False를 반환한다.
+        """
+        if self.has_space():
+            return True
+
+        if self.is_over_budget():
+            logger.error(f"작업 공간 예산 초과 (사용량 {self.get_used_bytes() / GB:.1f}GB / "
+                         f"예산 {self.disk_budget / GB:.1f}GB), 다운로드를 중단합니다.")
+            return False
+
+        logger.warning(
+            f"디스크 공간 부족으로 다운로드 일시 중지 "
+            f"(남은 용량 {self.get_free_bytes() / GB:.1f}GB, 사용량 {self.get_used_bytes() / GB:.1f}GB)"
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            if self.has_space():
+                logger.info("디스크 공간 확보됨, 다운로드 재개")
+                return True
+
+        logger.error("디스크 공간 확보 대기 시간 초과")
+        return False
+
+    def track(self, video_folder_path: str):
+        """처리 중인 영상 폴더를 사용량 추적 대상에 추가/갱신"""
+        self.tracked_usage[video_folder_path] = get_dir_size(video_folder_path)
+
+    def release(self, video_folder_path: str):
+        """처리가 끝난(실패 포함) 영상 폴더를 사용량 추적에서 제외"""
+        self.tracked_usage.pop(video_folder_path, None)
+
+    # ----------------- 정리 -----------------
+    def cleanup_after_combine(self, video_folder_path: str, combined_path: Optional[str] = None) -> int:
+        """이미지 합성 성공 후 보존 정책에 따라 중간 산출물 정리. 확보한 바이트 반환"""
+        before = get_dir_size(video_folder_path)
+        results_dir = os.path.join(video_folder_path, 'ResultsDir')
+
+        self._apply('rgb_images', os.path.join(results_dir, 'RGBImages'))
+        self._apply('txt_images', os.path.join(results_dir, 'TXTImages'))
+        for pack_path in get_pack_paths(results_dir):
+            self._apply('txt_images', pack_path)
+
+        if self.retention['video'] == 'delete':
+            for name in os.listdir(video_folder_path):
+                if name.lower().endswith(('.mp4', '.mkv', '.webm')):
+                    self._apply('video', os.path.join(video_folder_path, name))
+
+        if combined_path:
+            self._apply('combined', combined_path)
+
+        # 비어 있는 ResultsDir 정리
+        if os.path.isdir(results_dir) and not os.listdir(results_dir):
+            os.rmdir(results_dir)
+
+        after = get_dir_size(video_folder_path)
+        self.release(video_folder_path)
+        freed = max(0, before - after)
+        self.freed_bytes += freed
+        logger.info(f"중간 산출물 정리 완료: {video_folder_path} ({freed / 1024 ** 2:.1f}MB 확보)")
+        return freed
+
+    def _apply(self, artifact: str, path: str):
+        """산출물 하나에 보존 정책 적용"""
+        action = self.retention.get(artifact, 'keep')
+        if action == 'keep' or not os.path.exists(path):
+            return
+
+        if action == 'compress':
+            if os.path.isdir(path):
+                shutil.make_archive(path, 'zip', path)
+                shutil.rmtree(path)
+            else:
+                shutil.make_archive(path, 'zip', os.path.dirname(path), os.path.basename(path))
+                os.remove(path)
+            logger.info(f"압축 보관: {path}.zip")
+        elif action == 'delete':
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            logger.info(f"삭제: {path}")
+
+    def get_summary(self) -> str:
+        """작업 공간 사용 요약"""
+        return (f"사용량 {self.get_used_bytes() / GB:.2f}GB, "
+                f"정리로 확보 {self.freed_bytes / GB:.2f}GB, "
+                f"남은 디스크 {self.get_free_bytes() / GB:.1f}GB")
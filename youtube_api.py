@@ -6,26 +6,147 @@ YouTube API를 사용하여 쇼츠 영상 정보를 수집하는 모듈
 import re
 import logging
 import time
+import threading
 import urllib.parse
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from config import YOUTUBE_API_KEY, MAX_RESULTS_PER_REQUEST, API_REQUEST_DELAY
+from retry import get_policy, is_quota_error, CircuitOpenError
+from quota_planner import get_budget, BudgetExceededError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def get_best_thumbnail_url(snippet: Dict) -> Optional[str]:
+    """snippet의 썸네일 중 가장 큰 해상도의 URL"""
+    thumbnails = snippet.get("thumbnails", {})
+    for size in ("maxres", "standard", "high", "medium", "default"):
+        if size in thumbnails:
+            return thumbnails[size]["url"]
+    return None
+
+
+class VideoRecord:
+    """쇼츠 영상 정보 (메모리를 적게 쓰도록 __slots__ 사용, 기존 dict처럼 record['title']로도 접근 가능)"""
+
+    __slots__ = (
+        "video_id", "title", "upload_date", "view_count", "like_count", "comment_count",
+        "duration", "duration_seconds", "channel_id", "description", "tags", "thumbnail_url",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_api_item(cls, video: Dict, channel_id: str, parse_duration) -> "VideoRecord":
+        """videos().list 응답 항목으로 생성"""
+        snippet = video["snippet"]
+        statistics = video.get("statistics", {})
+        duration = video["contentDetails"]["duration"]
+        return cls(
+            video_id=video["id"],
+            title=snippet["title"],
+            upload_date=snippet["publishedAt"],
+            view_count=int(statistics.get("viewCount", 0)),
+            like_count=int(statistics.get("likeCount", 0)),
+            comment_count=int(statistics.get("commentCount", 0)),
+            duration=duration,
+            duration_seconds=parse_duration(duration),
+            channel_id=snippet.get("channelId", channel_id),
+            description=snippet.get("description", ""),
+            tags=tuple(snippet.get("tags", ())),
+            thumbnail_url=get_best_thumbnail_url(snippet),
+        )
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    def keys(self) -> List[str]:
+        return ["video_id", "url", *self.__slots__[1:]]
+
+    def __getitem__(self, key: str):
+        if key != "url" and key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key == "url" or key in self.__slots__
+
+    def get(self, key: str, default=None):
+        value = self[key] if key in self else None
+        return default if value is None else value
+
+    def to_dict(self) -> Dict:
+        """기존 형식의 dict로 변환"""
+        info = {key: self[key] for key in self.keys()}
+        info["tags"] = list(self.tags or ())
+        return info
+
+    def __repr__(self) -> str:
+        return f"VideoRecord(video_id={self.video_id!r}, title={self.title!r})"
+
+
 class YouTubeAPI:
     def __init__(self):
         """YouTube API 클라이언트 초기화"""
         self.youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+        self.retry_policy = get_policy("youtube_api")
+
+        # 채널 URL → 채널 ID, 채널 ID → 채널명 캐시 (같은 채널을 반복 조회할 때 검색 할당량 절약)
+        self._channel_id_cache: Dict[str, str] = {}
+        self._channel_name_cache: Dict[str, str] = {}
+        self._uploads_playlist_cache: Dict[str, str] = {}
+
+        # 검색 진행 상황 (예산 소진으로 중단했을 때 이어서 검색하기 위함)
+        self.last_page_token: Optional[str] = None
+        self.search_result_count = 0
+
+    def _execute(self, request):
+        """API 요청 실행 (재시도/백오프/서킷 브레이커 적용, 시도할 때마다 할당량 예산 차감)
+
+        실패한 요청도 할당량을 사용하므로 재시도마다 차감한다.
+        예산을 넘게 되면 요청하지 않고 BudgetExceededError 발생 (재시도하지 않음)
+        YouTube 일일 할당량이 소진된 경우도 BudgetExceededError로 바꿔 중단 지점 저장(--resume) 경로를 타게 한다.
+        """
+        budget = get_budget()
+        method_id = getattr(request, "methodId", "")
+
+        def attempt():
+            budget.charge_api(method_id)
+            return request.execute()
+
+        try:
+            return self.retry_policy.call(attempt)
+        except (HttpError, CircuitOpenError) as e:
+            if is_quota_error(e):
+                raise BudgetExceededError(budget.mark_exhausted("YouTube API 일일 할당량 소진")) from e
+            raise
+
+    def remember_channel(self, url: str, channel_id: str, channel_name: Optional[str] = None):
+        """이전 실행에서 조회한 채널 ID/이름을 캐시에 등록"""
+        self._channel_id_cache[url] = channel_id
+        if channel_name:
+            self._channel_name_cache[channel_id] = channel_name
 
     def extract_channel_id(self, url: str) -> Optional[str]:
-        """YouTube 채널 URL에서 채널 ID 추출"""
+        """YouTube 채널 URL에서 채널 ID 추출 (결과는 캐시)"""
+        if url in self._channel_id_cache:
+            return self._channel_id_cache[url]
+
+        channel_id = self._resolve_channel_id(url)
+        if channel_id:
+            self._channel_id_cache[url] = channel_id
+        return channel_id
+
+    def _resolve_channel_id(self, url: str) -> Optional[str]:
+        """YouTube 채널 URL에서 채널 ID 조회"""
 
         # URL 디코딩
         url = urllib.parse.unquote(url).strip("/")
@@ -70,7 +191,7 @@ class YouTubeAPI:
                 type="channel",
                 maxResults=1,
             )
-            response = search_request.execute()
+            response = self._execute(search_request)
             items = response.get("items", [])
             if items:
                 channel_id = items[0]["snippet"]["channelId"]
@@ -78,7 +199,7 @@ class YouTubeAPI:
                 return channel_id
             else:
                 logger.warning(f"채널 ID 검색 결과 없음: {username}")
-        except HttpError as e:
+        except (HttpError, CircuitOpenError) as e:
             logger.error(f"채널 ID 조회 중 오류: {e}")
         return None
 
@@ -86,18 +207,46 @@ class YouTubeAPI:
         """채널 기본 정보 조회"""
         try:
             request = self.youtube.channels().list(part="snippet", id=channel_id)
-            response = request.execute()
+            response = self._execute(request)
             items = response.get("items", [])
             if items:
                 return items[0]["snippet"]
-        except HttpError as e:
+        except (HttpError, CircuitOpenError) as e:
             logger.error(f"채널 정보 조회 중 오류: {e}")
         return None
 
+    def get_channel_statistics(self, channel_id: str) -> Optional[Dict]:
+        """채널 이름, 전체 영상 수, 개설일 조회 (API 1 unit)"""
+        try:
+            request = self.youtube.channels().list(part="snippet,statistics", id=channel_id)
+            response = self._execute(request)
+            items = response.get("items", [])
+            if items:
+                self._channel_name_cache[channel_id] = items[0]["snippet"]["title"]
+                return {
+                    "channel_name": items[0]["snippet"]["title"],
+                    "video_count": int(items[0]["statistics"].get("videoCount", 0)),
+                    "published_at": items[0]["snippet"]["publishedAt"],
+                }
+        except (HttpError, CircuitOpenError) as e:
+            logger.error(f"채널 통계 조회 중 오류: {e}")
+        return None
+
     def get_shorts_videos(self, channel_id: str, since_date: str) -> List[Dict]:
         """특정 날짜 이후의 쇼츠 영상 목록 조회"""
-        videos = []
-        next_page_token = None
+        videos = [record.to_dict() for record in self.iter_shorts_videos(channel_id, since_date)]
+        logger.info(f"총 {len(videos)}개의 쇼츠 영상을 찾았습니다.")
+        return videos
+
+    def iter_shorts_videos(self, channel_id: str, since_date: str,
+                           cancel: Optional[threading.Event] = None,
+                           page_token: Optional[str] = None) -> Iterator[VideoRecord]:
+        """특정 날짜 이후의 쇼츠 영상을 페이지가 도착하는 대로 하나씩 반환
+
+        cancel 이벤트가 set되면 다음 페이지를 요청하지 않고 종료한다.
+        page_token : 이전에 중단된 검색을 이어갈 페이지 (중단 시점의 last_page_token)
+        """
+        next_page_token = page_token
 
         # 날짜 형식 변환 및 ISO8601 UTC 포맷으로 변환
         since_datetime = datetime.strptime(since_date, "%Y-%m-%d")
@@ -105,7 +254,8 @@ class YouTubeAPI:
 
         logger.info(f"채널 {channel_id}에서 {since_date} 이후의 쇼츠 영상 검색 중...")
 
-        while True:
+        while cancel is None or not cancel.is_set():
+            self.last_page_token = next_page_token
             try:
                 search_request = self.youtube.search().list(
                     part="snippet",
@@ -116,10 +266,11 @@ class YouTubeAPI:
                     maxResults=MAX_RESULTS_PER_REQUEST,
                     pageToken=next_page_token,
                 )
-                search_response = search_request.execute()
+                search_response = self._execute(search_request)
                 items = search_response.get("items", [])
                 if not items:
                     break
+                self.search_result_count += len(items)
 
                 video_ids = [item["id"]["videoId"] for item in items]
 
@@ -127,36 +278,140 @@ class YouTubeAPI:
                     part="snippet,statistics,contentDetails",
                     id=",".join(video_ids),
                 )
-                videos_response = videos_request.execute()
-
-                for video in videos_response.get("items", []):
-                    if self.is_shorts_video(video):
-                        video_info = {
-                            "video_id": video["id"],
-                            "url": f"https://www.youtube.com/watch?v={video['id']}",
-                            "title": video["snippet"]["title"],
-                            "upload_date": video["snippet"]["publishedAt"],
-                            "view_count": int(video["statistics"].get("viewCount", 0)),
-                            "like_count": int(video["statistics"].get("likeCount", 0)),
-                            "comment_count": int(video["statistics"].get("commentCount", 0)),
-                            "duration": video["contentDetails"]["duration"],
-                        }
-                        videos.append(video_info)
-                        logger.info(f"쇼츠 영상 발견: {video_info['title']}")
-
-                next_page_token = search_response.get("nextPageToken")
-                if not next_page_token:
-                    break
+                videos_response = self._execute(videos_request)
+
+            except (HttpError, CircuitOpenError) as e:
+                logger.error(f"영상 검색 중 오류: {e}")
+                break
 
+            for video in videos_response.get("items", []):
+                if cancel is not None and cancel.is_set():
+                    return
+                if self.is_shorts_video(video):
+                    record = VideoRecord.from_api_item(video, channel_id, self.parse_duration_seconds)
+                    logger.info(f"쇼츠 영상 발견: {record.title}")
+                    yield record
+
+            next_page_token = search_response.get("nextPageToken")
+            if not next_page_token:
+                break
+
+            if cancel is not None:
+                cancel.wait(API_REQUEST_DELAY)
+            else:
                 time.sleep(API_REQUEST_DELAY)
 
-            except HttpError as e:
-                logger.error(f"영상 검색 중 오류: {e}")
+    def get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
+        """채널의 업로드 재생목록 ID (결과는 캐시)
+
+        채널 ID가 UC로 시작하면 UU로 바꾼 값이 업로드 재생목록이므로 API를 호출하지 않는다.
+        """
+        if channel_id in self._uploads_playlist_cache:
+            return self._uploads_playlist_cache[channel_id]
+
+        playlist_id = None
+        if channel_id.startswith("UC"):
+            playlist_id = "UU" + channel_id[2:]
+        else:
+            try:
+                request = self.youtube.channels().list(part="contentDetails", id=channel_id)
+                response = self._execute(request)
+                items = response.get("items", [])
+                if items:
+                    playlist_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+            except (HttpError, CircuitOpenError) as e:
+                logger.error(f"업로드 재생목록 조회 중 오류: {e}")
+
+        if playlist_id:
+            self._uploads_playlist_cache[channel_id] = playlist_id
+        return playlist_id
+
+    def get_recent_shorts(self, channel_id: str, since_date: str) -> List[Dict]:
+        """업로드 재생목록으로 특정 날짜 이후의 쇼츠 영상 목록 조회
+
+        페이지당 playlistItems.list 1 unit + videos.list 1 unit으로, search.list(100 units)보다 훨씬 저렴하여
+        감시 모드처럼 같은 채널을 반복해서 확인할 때 사용한다.
+        """
+        playlist_id = self.get_uploads_playlist_id(channel_id)
+        if playlist_id is None:
+            return []
+
+        since_datetime = datetime.strptime(since_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        videos = []
+        next_page_token = None
+
+        while True:
+            try:
+                playlist_request = self.youtube.playlistItems().list(
+                    part="contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=MAX_RESULTS_PER_REQUEST,
+                    pageToken=next_page_token,
+                )
+                playlist_response = self._execute(playlist_request)
+                items = playlist_response.get("items", [])
+
+                # 비공개/삭제된 영상은 videoPublishedAt이 없음
+                recent_ids, reached_since = [], False
+                for item in items:
+                    published_at = item["contentDetails"].get("videoPublishedAt")
+                    if not published_at:
+                        continue
+                    if datetime.fromisoformat(published_at.replace("Z", "+00:00")) >= since_datetime:
+                        recent_ids.append(item["contentDetails"]["videoId"])
+                    else:
+                        reached_since = True
+
+                videos_response = {}
+                if recent_ids:
+                    videos_request = self.youtube.videos().list(
+                        part="snippet,statistics,contentDetails",
+                        id=",".join(recent_ids),
+                    )
+                    videos_response = self._execute(videos_request)
+
+            except (HttpError, CircuitOpenError) as e:
+                logger.error(f"업로드 재생목록 조회 중 오류: {e}")
                 break
 
-        logger.info(f"총 {len(videos)}개의 쇼츠 영상을 찾았습니다.")
+            for video in videos_response.get("items", []):
+                if self.is_shorts_video(video):
+                    videos.append(VideoRecord.from_api_item(video, channel_id, self.parse_duration_seconds).to_dict())
+
+            # 업로드 재생목록은 최신순이므로 기준 날짜 이전 영상이 나오면 더 볼 필요 없음
+            next_page_token = playlist_response.get("nextPageToken")
+            if reached_since or not next_page_token:
+                break
+            time.sleep(API_REQUEST_DELAY)
+
+        logger.info(f"업로드 재생목록에서 {since_date} 이후 쇼츠 {len(videos)}개 확인")
         return videos
 
+    def get_video_statistics(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """영상 ID 목록(최대 50개)의 최신 통계 조회 (API 1 unit)
+
+        반환값 : {video_id: {'view_count': ..., 'like_count': ..., 'comment_count': ...}}
+        """
+        request = self.youtube.videos().list(
+            part="statistics",
+            id=",".join(video_ids[:MAX_RESULTS_PER_REQUEST]),
+        )
+        response = self._execute(request)
+
+        statistics = {}
+        for video in response.get("items", []):
+            stats = video.get("statistics", {})
+            statistics[video["id"]] = {
+                "view_count": int(stats.get("viewCount", 0)),
+                "like_count": int(stats.get("likeCount", 0)),
+                "comment_count": int(stats.get("commentCount", 0)),
+            }
+        return statistics
+
+    def get_best_thumbnail_url(self, snippet: Dict) -> Optional[str]:
+        """snippet의 썸네일 중 가장 큰 해상도의 URL"""
+        return get_best_thumbnail_url(snippet)
+
     def is_shorts_video(self, video: Dict) -> bool:
         """영상이 쇼츠인지 판단"""
         duration = video["contentDetails"]["duration"]
@@ -193,16 +448,21 @@ class YouTubeAPI:
         channel_id = self.extract_channel_id(url)
         if not channel_id:
             return "UnknownChannel"
+        if channel_id in self._channel_name_cache:
+            return self._channel_name_cache[channel_id]
         
         try:
             request = self.youtube.channels().list(
                 part="snippet",
                 id=channel_id
             )
-            response = request.execute()
+            response = self._execute(request)
             items = response.get("items", [])
             if items:
-                return items[0]["snippet"]["title"]
+                self._channel_name_cache[channel_id] = items[0]["snippet"]["title"]
+                return self._channel_name_cache[channel_id]
+        except BudgetExceededError:
+            raise
         except Exception as e:
             logger.error(f"채널 이름 조회 중 오류: {e}")
         